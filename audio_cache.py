@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class AudioCache:
+    """Content-addressed on-disk store of synthesized clips with LRU eviction.
+
+    Clips are keyed by a hash of (text, language, voice options) so a word is
+    only ever synthesized once per voice. Every entry records the sha256 of its
+    payload and is verified on read; a corrupt or missing file is treated as a
+    miss and dropped from the index.
+    """
+
+    INDEX_NAME = "index.json"
+    TMP_GRACE = 3600  # seconds before an unfinished write is taken for a crash's leftover
+
+    def __init__(self, directory="audio_cache", max_bytes=256 * 1024 * 1024, autoflush=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.autoflush = autoflush  # write the index after every put; bulk writers turn this off
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> {'size', 'sha256', 'atime', 'ext'}, oldest first
+        self._total_bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text, lang="fr", **options):
+        payload = json.dumps([text, lang, sorted(options.items())], ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_index(self):
+        entries = self._read_index()
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("atime", 0)):
+            if os.path.exists(self._path(key, entry.get("ext", "mp3"))):
+                self._entries[key] = entry
+                self._total_bytes += entry["size"]
+        self._dirty = len(self._entries) != len(entries)
+        # The directory may be shared with other processes (the game, prerender): a clip
+        # another one wrote after its last index flush is adopted, and only temporary files
+        # old enough to be left over from a crash are removed.
+        known = {f"{key}.{entry.get('ext', 'mp3')}" for key, entry in self._entries.items()}
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                try:
+                    if now - os.path.getmtime(path) > self.TMP_GRACE:
+                        os.remove(path)
+                except OSError:
+                    pass
+                continue
+            key, _, ext = name.partition(".")
+            if name == self.INDEX_NAME or name in known or len(key) != 64 or not ext:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                atime = os.path.getmtime(path)
+            except OSError:
+                continue  # Evicted by its writer meanwhile
+            self._entries[key] = {"size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+                                  "atime": atime, "ext": ext}
+            self._entries.move_to_end(key, last=False)  # Least recently used, as far as we know
+            self._total_bytes += len(data)
+            self._dirty = True
+
+    def _merge_index(self):
+        # Keep what other processes added to the index since it was loaded, so flushing
+        # doesn't throw their entries away; clips since evicted (by anyone) are left out
+        for key, entry in self._read_index().items():
+            if key not in self._entries and os.path.exists(self._path(key, entry.get("ext", "mp3"))):
+                self._entries[key] = entry
+                self._entries.move_to_end(key, last=False)
+                self._total_bytes += entry["size"]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def contains(self, text, lang="fr", **options):
+        return self.make_key(text, lang, **options) in self._entries
+
+    def get(self, text, lang="fr", **options):
+        """Return the cached clip bytes, or None on a miss or failed integrity check."""
+        return self.get_by_key(self.make_key(text, lang, **options))
+
+    def get_by_key(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key, entry.get("ext", "mp3")), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is None or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                self._drop(key)
+                self.misses += 1
+                return None
+            entry["atime"] = time.time()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return data
+
+    def put(self, text, lang, data, ext="mp3", **options):
+        key = self.make_key(text, lang, **options)
+        self.put_by_key(key, data, ext)
+        return key
+
+    def put_by_key(self, key, data, ext="mp3"):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            path = self._path(key, ext)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._entries[key] = {
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "atime": time.time(),
+                "ext": ext,
+            }
+            self._total_bytes += len(data)
+            self._evict()
+            self._dirty = True
+        if self.autoflush:
+            self.flush()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry["size"]
+        try:
+            os.remove(self._path(key, entry.get("ext", "mp3")))
+        except OSError:
+            pass
+        self._dirty = True
+
+    def _evict(self):
+        # Never evict the entry that was just added, even if it alone exceeds the cap.
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def verify(self):
+        """Check every entry against its recorded hash and drop the bad ones. Returns dropped keys."""
+        bad = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                try:
+                    with open(self._path(key, entry.get("ext", "mp3")), "rb") as f:
+                        ok = hashlib.sha256(f.read()).hexdigest() == entry["sha256"]
+                except OSError:
+                    ok = False
+                if not ok:
+                    self._drop(key)
+                    bad.append(key)
+        self.flush()
+        return bad
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._merge_index()
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from audio_cache import AudioCache
+from batch_synth import decode_pcm
+from tts_engines import audio_ext, cache_engine, engine_spec, get_backend
+
+MAGIC = b'BVPK'
+VERSION = 1
+# magic, version, sample rate, index length
+HEADER = struct.Struct('<4sHIQ')
+ALIGN = 16
+
+pack_directory = 'audio_packs'
+
+
+def pack_path_for(deck_path, engine='gtts'):
+    # Decks in different directories share names (list1.csv, ...); the path digest keeps their packs apart
+    name = os.path.splitext(os.path.basename(deck_path))[0]
+    digest = hashlib.sha1(os.path.abspath(deck_path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(pack_directory, f"{name}-{digest}-{engine.replace(',', '+')}.pack")
+
+
+def _resample(samples, src_rate, dst_rate):
+    if src_rate == dst_rate:
+        return samples
+    positions = np.arange(0, len(samples), src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+def build_pack(words, clips, pack_path, rate=22050):
+    """Write decoded mono 16-bit PCM for `words` (clip bytes in `clips`) as one pack file.
+
+    Layout: a fixed header, a JSON index of word -> [sample offset, sample count],
+    then the PCM of every clip back to back, aligned so it can be viewed in place.
+    """
+    index = {}
+    pcm = []
+    offset = 0
+    for word, clip in zip(words, clips):
+        samples, clip_rate = decode_pcm(clip)
+        samples = _resample(samples, clip_rate, rate)
+        index[word] = [offset, len(samples)]
+        pcm.append(samples)
+        offset += len(samples)
+    index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+    data_start = HEADER.size + len(index_bytes)
+    padding = (-data_start) % ALIGN
+    os.makedirs(os.path.dirname(pack_path) or '.', exist_ok=True)
+    tmp_path = pack_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rate, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(b'\0' * padding)
+        for samples in pcm:
+            f.write(np.ascontiguousarray(samples, dtype='<i2').tobytes())
+    os.replace(tmp_path, pack_path)
+    return len(index), offset
+
+
+def time_stretch(samples, speed, window=1024):
+    """Change duration by 1/`speed` without changing pitch (overlap-add of Hann-windowed frames).
+
+    All frames are gathered and windowed in one vectorized step; speed < 1 slows speech down.
+    """
+    if speed == 1.0 or len(samples) < window:
+        return samples
+    synthesis_hop = window // 2
+    analysis_hop = max(1, int(round(synthesis_hop * speed)))
+    n_frames = (len(samples) - window) // analysis_hop + 1
+    win = np.hanning(window).astype(np.float32)
+    offsets = np.arange(window)
+    frames = samples[offsets[None, :] + analysis_hop * np.arange(n_frames)[:, None]].astype(np.float32) * win
+    out = np.zeros(synthesis_hop * (n_frames - 1) + window, dtype=np.float32)
+    norm = np.zeros_like(out)
+    positions = offsets[None, :] + synthesis_hop * np.arange(n_frames)[:, None]
+    np.add.at(out, positions, frames)
+    np.add.at(norm, positions, np.broadcast_to(win, frames.shape))
+    out /= np.maximum(norm, 1e-3)
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+class AudioPack:
+    """Read-only, memory-mapped view of a pack file.
+
+    `samples(word)` returns a numpy view straight into the mapping, so reading
+    a clip costs no file open and no decode. `sound` still copies the samples
+    into a new pygame mixer chunk every time it is called. Slowed variants are
+    derived from the same PCM with `time_stretch`, so they need no extra
+    synthesis; the `max_variants` most recently played are kept.
+    """
+
+    def __init__(self, pack_path, max_variants=64):
+        self.path = pack_path
+        self._file = open(pack_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rate, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{pack_path} is not a version {VERSION} audio pack")
+        self.index = json.loads(self._map[HEADER.size:HEADER.size + index_length].decode('utf-8'))
+        data_start = HEADER.size + index_length
+        data_start += (-data_start) % ALIGN
+        self._pcm = np.frombuffer(self._map, dtype='<i2', offset=data_start)
+        self.max_variants = max_variants
+        self._variants = OrderedDict()  # (word, speed) -> stretched samples, least recently played first
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def samples(self, word):
+        offset, count = self.index[word]
+        return self._pcm[offset:offset + count]
+
+    def ensure_mixer(self):
+        """(Re)initialise the mixer to the pack's mono format so slices can be handed over as-is."""
+        import pygame
+        if pygame.mixer.get_init() != (self.rate, -16, 1):
+            pygame.mixer.quit()
+            pygame.mixer.init(frequency=self.rate, size=-16, channels=1)
+
+    def sound(self, word, speed=1.0):
+        import pygame
+        if speed == 1.0:
+            return pygame.mixer.Sound(buffer=self.samples(word))
+        key = (word, speed)
+        stretched = self._variants.get(key)
+        if stretched is None:
+            stretched = time_stretch(self.samples(word), speed)
+            self._variants[key] = stretched
+            if len(self._variants) > self.max_variants:
+                self._variants.popitem(last=False)
+        else:
+            self._variants.move_to_end(key)
+        return pygame.mixer.Sound(buffer=stretched)
+
+    def close(self):
+        self._pcm = None
+        self._variants.clear()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Slices handed out are still alive; the mapping goes away with them
+        self._file.close()
+
+
+def main():
+    from prerender import find_decks, read_deck_words
+    parser = argparse.ArgumentParser(description="Build memory-mappable audio packs for decks")
+    parser.add_argument('paths', nargs='+', help='CSV decks or directories of decks')
+    parser.add_argument('--engine', type=engine_spec, default='gtts', help='Speech engine whose clips are packed')
+    parser.add_argument('--lang', default='fr')
+    parser.add_argument('--rate', type=int, default=22050, help='Sample rate of the packed PCM')
+    parser.add_argument('--cache-dir', default='audio_cache')
+    args = parser.parse_args()
+
+    cache = AudioCache(args.cache_dir)
+    backend = get_backend(args.engine)
+    for deck in find_decks(args.paths):
+        words = list(dict.fromkeys(read_deck_words(deck)))
+        clips = []
+        for word in words:
+            clip = cache.get(word, args.lang, engine=cache_engine(args.engine))
+            if clip is None:
+                clip, produced_by = backend.synthesize_named(word, args.lang)
+                cache.put(word, args.lang, clip, ext=audio_ext(clip), engine=produced_by)
+            clips.append(clip)
+        pack_path = pack_path_for(deck, args.engine)
+        count, samples = build_pack(words, clips, pack_path, args.rate)
+        print(f"{pack_path}: {count} clips, {samples / args.rate:.1f}s of audio, "
+              f"{os.path.getsize(pack_path) / 1024:.0f} KiB")
+    cache.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import io
+import wave
+
+import numpy as np
+
+from tts_engines import audio_ext, cache_engine, get_backend
+
+# Joined between words so every engine renders a sentence-length pause there
+SEPARATOR = " . "
+CHUNK_SIZE = 25
+
+
+def decode_pcm(audio):
+    """Decode a clip to (mono int16 samples, sample rate). WAV is read directly, anything else via pygame."""
+    if audio[:4] == b'RIFF':
+        with wave.open(io.BytesIO(audio)) as w:
+            rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+            frames = w.readframes(w.getnframes())
+        if width != 2:
+            raise ValueError("only 16-bit WAV is supported")
+        samples = np.frombuffer(frames, dtype=np.int16)
+    else:
+        import pygame
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        rate, _, channels = pygame.mixer.get_init()
+        samples = pygame.sndarray.array(pygame.mixer.Sound(file=io.BytesIO(audio))).reshape(-1)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+def encode_wav(samples, rate):
+    fp = io.BytesIO()
+    with wave.open(fp, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+    return fp.getvalue()
+
+
+def find_segments(samples, rate, frame_ms=10, threshold_db=-35.0, min_silence=0.35, pad=0.05):
+    """Return (start, end) sample ranges of the voiced stretches separated by long silences.
+
+    Frame energy is computed for all frames at once; a frame is silent when its
+    RMS is `threshold_db` below the loudest frame. Only silent runs of at least
+    `min_silence` seconds split segments, so short gaps inside a phrase do not.
+    """
+    frame = max(1, int(rate * frame_ms / 1000))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+    frames = samples[:n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    peak = rms.max()
+    if peak == 0:
+        return []
+    voiced = rms > peak * (10 ** (threshold_db / 20))
+
+    # Run-length encode the voiced mask: boundaries where it flips
+    edges = np.flatnonzero(np.diff(voiced.astype(np.int8))) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [n_frames]))
+    run_voiced = voiced[starts]
+
+    # Long silent runs cut the clip; each piece is then trimmed to its first and last voiced frame
+    min_gap = int(np.ceil(min_silence * 1000 / frame_ms))
+    cuts = ~run_voiced & ((ends - starts) >= min_gap)
+    piece_starts = np.concatenate(([0], ends[cuts]))
+    piece_ends = np.concatenate((starts[cuts], [n_frames]))
+    voiced_idx = np.flatnonzero(voiced)
+    lo = np.searchsorted(voiced_idx, piece_starts)
+    hi = np.searchsorted(voiced_idx, piece_ends)
+    keep = hi > lo
+    seg_starts = voiced_idx[lo[keep]]
+    seg_ends = voiced_idx[hi[keep] - 1] + 1
+
+    pad_frames = int(pad * 1000 / frame_ms)
+    seg_starts = np.maximum(0, seg_starts - pad_frames) * frame
+    seg_ends = np.minimum(n_frames, seg_ends + pad_frames) * frame
+    return list(zip(seg_starts.tolist(), seg_ends.tolist()))
+
+
+def split_chunk(audio, count):
+    """Split one multi-word clip into `count` WAV clips, or return None if the split is ambiguous."""
+    samples, rate = decode_pcm(audio)
+    segments = find_segments(samples, rate)
+    if len(segments) != count:
+        return None
+    return [encode_wav(samples[start:end], rate) for start, end in segments]
+
+
+def synthesize_chunk(words, lang='fr', engine='gtts'):
+    """Synthesize `words` with one engine call and split the result back per word.
+
+    Returns (clips, batched): `clips` are (clip, name of the engine that
+    produced it) pairs, and `batched` is False when the segment count did not
+    match and every word was synthesized on its own instead. Clips cut from a
+    sentence can sound slightly clipped next to standalone synthesis, which is
+    the price of one request per chunk.
+    """
+    backend = get_backend(engine)
+    if len(words) > 1:
+        try:
+            audio, produced_by = backend.synthesize_named(SEPARATOR.join(words), lang)
+            clips = split_chunk(audio, len(words))
+        except Exception:
+            clips = None
+        if clips is not None:
+            return [(clip, produced_by) for clip in clips], True
+    return [backend.synthesize_named(word, lang) for word in words], False
+
+
+def synthesize_batch(words, cache, lang='fr', engine='gtts', chunk_size=CHUNK_SIZE):
+    """Fill `cache` for every uncached word in chunks of `chunk_size`. Returns (calls saved, fallbacks)."""
+    todo = [w for w in dict.fromkeys(words) if not cache.contains(w, lang, engine=cache_engine(engine))]
+    saved = fallbacks = 0
+    for i in range(0, len(todo), chunk_size):
+        # Words the game had to synthesize on the spot meanwhile are not done again
+        chunk = [w for w in todo[i:i + chunk_size] if not cache.contains(w, lang, engine=cache_engine(engine))]
+        if not chunk:
+            continue
+        clips, batched = synthesize_chunk(chunk, lang, engine)
+        for word, (clip, produced_by) in zip(chunk, clips):
+            cache.put(word, lang, clip, ext=audio_ext(clip), engine=produced_by)
+        if batched:
+            saved += len(chunk) - 1
+        elif len(chunk) > 1:
+            fallbacks += 1
+    return saved, fallbacks
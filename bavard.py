@@ -1,5 +1,7 @@
 from textual.app import App
 from screens.file_picker import FilePickerScreen
+from deck import DeckCache
+from study_store import StudyStore
 
 class Bavard(App):
     CSS = """
@@ -50,7 +52,15 @@ class Bavard(App):
     """
     
     def on_mount(self) -> None:
+        # Shared by every screen that records answers
+        self.store = StudyStore()
+        self.store.import_legacy_csvs()
+        # Parsed decks, borrowed by the loader and flashcard screens
+        self.decks = DeckCache()
         self.push_screen(FilePickerScreen())
 
+    def on_unmount(self) -> None:
+        self.store.close()
+
 if __name__ == "__main__":
     Bavard().run()
@@ -0,0 +1,137 @@
+import random
+from collections import deque
+from itertools import islice
+
+from sampler import ShuffleBag, WeightedSampler
+
+
+class CardOrder:
+    """Hands out card indices for a session and can look ahead without consuming them.
+
+    Subclasses implement `_draw`; `peek` pre-draws into a buffer so the cards it
+    reports are exactly the ones `next` will return, which is what the audio
+    prefetcher relies on.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._lookahead = deque()
+
+    def _draw(self):
+        raise NotImplementedError
+
+    def next(self):
+        if self._lookahead:
+            return self._lookahead.popleft()
+        return self._draw()
+
+    def peek(self, count):
+        while len(self._lookahead) < count:
+            self._lookahead.append(self._draw())
+        return list(islice(self._lookahead, count))
+
+
+class SequentialOrder(CardOrder):
+    def __init__(self, size, start=0):
+        super().__init__(size)
+        self._index = start
+
+    def _draw(self):
+        if self._index >= self.size:  # Wrap around at the end of the list
+            self._index = 0
+        index = self._index
+        self._index += 1
+        return index
+
+
+class BackwardOrder(CardOrder):
+    def __init__(self, size):
+        super().__init__(size)
+        self._index = size - 1
+
+    def _draw(self):
+        if self._index < 0:  # Wrap around at the start of the list
+            self._index = self.size - 1
+        index = self._index
+        self._index -= 1
+        return index
+
+
+class RandomOrder(CardOrder):
+    def __init__(self, size, rng=None):
+        super().__init__(size)
+        self._rng = rng or random.Random()
+
+    def _draw(self):
+        return self._rng.randint(0, self.size - 1)
+
+
+class WeightedOrder(CardOrder):
+    """Random order weighted by how often each card is missed (see `sampler`).
+
+    `bag=True` draws without replacement, one pass over the deck per bag. With
+    replacement, the card just drawn sits out the next draw so it never comes
+    up twice in a row. Weights changed with `update` apply to draws not yet
+    made; cards already buffered by `peek` keep their place.
+    """
+
+    def __init__(self, weights, rng=None, bag=False):
+        super().__init__(len(weights))
+        self.sampler = ShuffleBag(weights, rng) if bag else WeightedSampler(weights, rng)
+        self._bag = bag
+        self._held = None  # (index, weight) of the card sitting out
+
+    def update(self, index, weight):
+        if self._held is not None and self._held[0] == index:
+            self._held = (index, weight)
+        else:
+            self.sampler.update(index, weight)
+
+    def _draw(self):
+        if self._bag or self.size < 2:
+            return self.sampler.draw()
+        held = self._held
+        # Draw before handing the held card back, so the last card is excluded
+        try:
+            index = self.sampler.draw()
+        except IndexError:
+            if held is None:
+                raise
+            return held[0]  # Only the held card has any weight left
+        self._held = (index, self.sampler.weights[index])
+        self.sampler.update(index, 0)
+        if held is not None:
+            self.sampler.update(*held)
+        return index
+
+
+class ScheduledOrder(CardOrder):
+    """Spaced-repetition order: cards come off a `scheduler.Scheduler` by due date.
+
+    Unlike the other orders this one depends on the answers, so the game must
+    report each card back with `scheduler.answer` before asking for the next.
+    """
+
+    def __init__(self, scheduler):
+        super().__init__(len(scheduler))
+        self.scheduler = scheduler
+
+    def next(self):
+        return self.scheduler.next()
+
+    def peek(self, count):
+        return self.scheduler.peek(count)
+
+
+def make_order(args, size, weights=None):
+    # Mirrors the precedence of the original if/elif chain in the game loop
+    if args.no_random:
+        return SequentialOrder(size)
+    if args.backward:
+        return BackwardOrder(size)
+    if args.stats:
+        return SequentialOrder(size)
+    rng = random.Random(args.seed)
+    if args.sampling == 'uniform' or weights is None:
+        return RandomOrder(size, rng)
+    return WeightedOrder(weights, rng, bag=args.sampling == 'bag')
@@ -0,0 +1,167 @@
+import argparse
+import os
+import random
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+from deck_cache import load_table
+from deck_paths import deck_roots, pinned_decks
+from study_store import DB_PATH, SCHEMA
+
+DeckEntry = namedtuple('DeckEntry', 'path name rows sha256 answers correct last_studied')
+
+
+def accuracy(entry):
+    return entry.correct / entry.answers if entry.answers else None
+
+
+class DeckCatalog:
+    """Index of every deck under the configured roots, kept in the study database.
+
+    `refresh` only lists directories whose mtime moved and only re-reads CSVs
+    whose size or mtime moved; per-deck answer totals are kept current by
+    `StudyStore.record`. After `load` (done by both), listing is a ready list,
+    picking by number is an index and a random pick is `random.choice` on a
+    per-directory list.
+    """
+
+    def __init__(self, path=DB_PATH, roots=None, pinned=None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.roots = [os.path.abspath(r) for r in (deck_roots if roots is None else roots)]
+        self.pinned = [os.path.abspath(p) for p in (pinned_decks if pinned is None else pinned)]
+        self.entries = []
+        self._by_dir = {}
+        self.load()
+
+    def load(self):
+        rank = {path: i for i, path in enumerate(self.pinned)}
+        rows = self.conn.execute(
+            "SELECT path, rows, sha256, answers, correct, last_studied FROM decks ORDER BY path")
+        entries = [DeckEntry(path, os.path.basename(path), *rest) for path, *rest in rows]
+        # Pinned decks first in their configured order, then everything else by path
+        entries.sort(key=lambda e: rank.get(e.path, len(rank)))
+        self.entries = entries
+        self._by_dir = {}
+        for entry in entries:
+            self._by_dir.setdefault(os.path.dirname(entry.path), []).append(entry)
+        return entries
+
+    def _scan_dir(self, directory):
+        subdirs, decks = [], []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.csv'):
+                    decks.append(entry.path)
+        return subdirs, decks
+
+    def _record_dir(self, directory, parent, mtime_ns, subdirs):
+        self.conn.execute("DELETE FROM catalog_dirs WHERE parent = ? AND path NOT IN (%s)"
+                          % ','.join('?' * len(subdirs)), (directory, *subdirs))
+        self.conn.execute("INSERT OR REPLACE INTO catalog_dirs VALUES (?, ?, ?)", (directory, parent, mtime_ns))
+
+    def refresh(self):
+        """Bring the index up to date. Returns (decks indexed or re-indexed, decks dropped).
+
+        Decks are parsed outside any transaction and each one is committed on
+        its own, so answers being recorded meanwhile never wait on the walk.
+        Directory listings are recorded last: if the walk is cut short, they
+        are scanned again next time rather than trusted without their decks.
+        """
+        known_dirs = dict(self.conn.execute("SELECT path, mtime_ns FROM catalog_dirs"))
+        known_decks = {path: (size, mtime_ns) for path, size, mtime_ns
+                       in self.conn.execute("SELECT path, size, mtime_ns FROM decks")}
+        found = set()
+        scanned = []  # (directory, parent, mtime_ns, subdirs) of listings that changed
+        stack = [(root, None) for root in self.roots]
+        while stack:
+            directory, parent = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            if known_dirs.get(directory) == mtime_ns:
+                # Unchanged listing: reuse the recorded subdirectories and decks
+                subdirs = [p for (p,) in self.conn.execute(
+                    "SELECT path FROM catalog_dirs WHERE parent = ?", (directory,))]
+                decks = [p for (p,) in self.conn.execute(
+                    "SELECT path FROM decks WHERE dir = ?", (directory,))]
+            else:
+                try:
+                    subdirs, decks = self._scan_dir(directory)
+                except OSError:
+                    continue
+                scanned.append((directory, parent, mtime_ns, subdirs))
+            stack.extend((sub, directory) for sub in subdirs)
+            found.update(decks)
+        found.update(p for p in self.pinned if os.path.isfile(p))
+
+        updated = 0
+        for path in found:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if known_decks.get(path) == (st.st_size, st.st_mtime_ns):
+                continue
+            try:
+                table = load_table(path)
+            except Exception:
+                continue  # Not a readable deck; retried once it or its directory changes
+            with self.conn:
+                totals = self.conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(correct), 0), MAX(ts) FROM events WHERE deck = ?",
+                    (path,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO decks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, os.path.dirname(path), st.st_size, st.st_mtime_ns, len(table), table.sha256, *totals))
+            updated += 1
+
+        gone = [path for path in known_decks if path not in found]
+        with self.conn:
+            for directory, parent, mtime_ns, subdirs in scanned:
+                self._record_dir(directory, parent, mtime_ns, subdirs)
+            self.conn.executemany("DELETE FROM decks WHERE path = ?", [(p,) for p in gone])
+        self.load()
+        return updated, len(gone)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, number):
+        """Entry shown as `number` (1-based) in `entries` order."""
+        return self.entries[number - 1]
+
+    def random_deck(self, directory=None, rng=random):
+        """A random deck, optionally only among those directly in `directory`."""
+        pool = self.entries if directory is None else self._by_dir.get(os.path.abspath(directory), [])
+        if not pool:
+            raise FileNotFoundError(f"no decks indexed in {directory or 'the catalog'}")
+        return rng.choice(pool)
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deck catalog")
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+    catalog = DeckCatalog(args.db)
+    updated, gone = catalog.refresh()
+    print(f"{len(catalog)} decks ({updated} re-indexed, {gone} removed)")
+    for number, entry in enumerate(catalog.entries, 1):
+        acc = accuracy(entry)
+        last = datetime.fromtimestamp(entry.last_studied).strftime('%Y-%m-%d') if entry.last_studied else '-'
+        print(f"{number:>4}  {entry.name:<30} {entry.rows:>6} cards  "
+              f"{f'{acc:.0%}' if acc is not None else '-':>5}  {last}")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+from deck_cache import card_id, load_table
+from distractors import DistractorIndex
+from grading import AnswerIndex
+from normalization import normalize_answer
+
+
+class StringColumn:
+    """Immutable column of strings kept as one joined string plus an offsets array.
+
+    About one byte per character and four per row, instead of a full str object
+    per cell; `column[i]` is an O(1) slice.
+    """
+
+    __slots__ = ('_blob', '_offsets')
+
+    def __init__(self, values):
+        offsets = array('I', [0])
+        position = 0
+        for value in values:
+            position += len(value)
+            offsets.append(position)
+        self._blob = ''.join(values)
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+    def __iter__(self):
+        blob, offsets = self._blob, self._offsets
+        return (blob[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1))
+
+    def tolist(self):
+        return list(self)
+
+    def nbytes(self):
+        return sys.getsizeof(self._blob) + sys.getsizeof(self._offsets)
+
+
+class Deck:
+    """The prompt and answer columns of a deck, stripped and pre-normalized once at load.
+
+    Card `i` is `prompts[i]` (shown or spoken), `answers[i]` (expected reply),
+    their normalized `prompt_keys[i]` / `answer_keys[i]` for grading, and its
+    stable `ids[i]`. With `strip_articles` the keys also drop a leading article,
+    so replies are graded with or without one. `prompt_index` / `answer_index`
+    grade replies with typo tolerance and `distractor_index` finds wrong
+    choices for multiple choice; each is built on first use. Nothing here
+    touches pandas after construction.
+    """
+
+    __slots__ = ('path', 'ids', 'prompts', 'answers', 'prompt_keys', 'answer_keys', '_prompt_index', '_answer_index',
+                 '_distractor_index')
+
+    def __init__(self, path, ids, prompts, answers, strip_articles=False):
+        self.path = path
+        self.ids = ids
+        self.prompts = StringColumn([p.strip() for p in prompts])
+        self.answers = StringColumn([a.strip() for a in answers])
+        self.prompt_keys = StringColumn([normalize_answer(p, strip_articles=strip_articles) for p in prompts])
+        self.answer_keys = StringColumn([normalize_answer(a, strip_articles=strip_articles) for a in answers])
+        self._prompt_index = self._answer_index = self._distractor_index = None
+
+    @classmethod
+    def from_table(cls, table, prompt_col=1, answer_col=0, strip_articles=False):
+        return cls(os.path.abspath(table.path), array('q', table.ids),
+                   table.column(prompt_col), table.column(answer_col), strip_articles)
+
+    @classmethod
+    def from_dataframe(cls, df, prompt_col=1, answer_col=0, path="", strip_articles=False):
+        """Build from a frame; its index is taken as card ids when it is named card_id."""
+        prompts = df.iloc[:, prompt_col].astype(str).tolist()
+        answers = df.iloc[:, answer_col].astype(str).tolist()
+        if df.index.name == 'card_id':
+            ids = array('q', df.index.tolist())
+        else:
+            cells = df.astype(str).apply(lambda col: col.str.strip()).itertuples(index=False)
+            ids = array('q', (card_id(row) for row in cells))
+        return cls(os.path.abspath(path) if path else "", ids, prompts, answers, strip_articles)
+
+    @property
+    def prompt_index(self):
+        if self._prompt_index is None:
+            self._prompt_index = AnswerIndex(self.prompt_keys)
+        return self._prompt_index
+
+    @property
+    def answer_index(self):
+        if self._answer_index is None:
+            self._answer_index = AnswerIndex(self.answer_keys)
+        return self._answer_index
+
+    @property
+    def distractor_index(self):
+        if self._distractor_index is None:
+            self._distractor_index = DistractorIndex(self.prompt_keys, self.answer_keys)
+        return self._distractor_index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self):
+        return (sys.getsizeof(self.ids) + self.prompts.nbytes() + self.answers.nbytes()
+                + self.prompt_keys.nbytes() + self.answer_keys.nbytes())
+
+
+def load_deck(path, prompt_col=1, answer_col=0, strip_articles=False):
+    # Columns default to the CLI's layout: English in the first, French in the second
+    return Deck.from_table(load_table(path), prompt_col, answer_col, strip_articles)
+
+
+def _table_nbytes(table):
+    cells = sum(sys.getsizeof(value) for column in table.data for value in column)
+    return cells + 8 * len(table) * len(table.columns) + sys.getsizeof(table.ids)
+
+
+class DeckCache:
+    """LRU of parsed decks shared by the screens of an app, bounded by an estimated memory budget.
+
+    Entries are keyed by absolute path and validated by mtime, so an edited
+    file is a miss. Each entry holds the deck's table and every `Deck` built
+    from it (one per prompt/answer column pair). Screens borrow from here and
+    drop their reference when suspended, so only the cache keeps decks alive.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> [mtime_ns, table, decks, nbytes]
+        self._loading = {}  # (path, mtime_ns) -> Future of the entry being parsed
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        # Screens load decks from worker threads. The lock only guards the
+        # bookkeeping: files are parsed outside it, so a cache hit never waits
+        # on another deck's parse, and a second caller for the same file waits
+        # on its future instead of parsing it again.
+        self._lock = threading.Lock()
+
+    def _entry(self, path, progress=None):
+        path = os.path.abspath(path)
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime_ns:
+                self.hits += 1
+                self._entries.move_to_end(path)
+                return entry
+            future = self._loading.get((path, mtime_ns))
+            parsing = future is None
+            if parsing:
+                self.misses += 1
+                future = self._loading[(path, mtime_ns)] = Future()
+        if not parsing:
+            return future.result()
+        try:
+            table = load_table(path, progress=progress)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[(path, mtime_ns)]
+            future.set_exception(e)
+            raise
+        entry = [mtime_ns, table, {}, _table_nbytes(table)]
+        with self._lock:
+            del self._loading[(path, mtime_ns)]
+            stale = self._entries.get(path)
+            if stale is not None:
+                self.nbytes -= stale[3]
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            self.nbytes += entry[3]
+            self._evict()
+        future.set_result(entry)
+        return entry
+
+    def _evict(self):
+        # The most recent entry always stays, even if it alone is over budget
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.nbytes -= entry[3]
+            self.evictions += 1
+
+    def table(self, path, progress=None):
+        return self._entry(path, progress)[1]
+
+    def deck(self, path, prompt_col=1, answer_col=0):
+        entry = self._entry(path)
+        with self._lock:
+            deck = entry[2].get((prompt_col, answer_col))
+        if deck is not None:
+            return deck
+        built = Deck.from_table(entry[1], prompt_col, answer_col)
+        with self._lock:
+            # Two callers may have built it at once; both get the one that was kept
+            deck = entry[2].setdefault((prompt_col, answer_col), built)
+            if deck is built:
+                entry[3] += deck.nbytes()
+                if self._entries.get(os.path.abspath(path)) is entry:
+                    self.nbytes += deck.nbytes()
+                    self._evict()
+        return deck
+
+    def summary(self):
+        return (f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+                f"{len(self._entries)} decks, {self.nbytes / 2**20:.1f}/{self.max_bytes / 2**20:.0f} MiB")
+
+
+def _bench(rows, lookups):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'deck.csv')
+        pd.DataFrame({
+            'English': [f"the word number {i} " for i in range(rows)],
+            'French': [f"le mot numéro {i} " for i in range(rows)],
+        }).to_csv(path, index=False)
+        table = load_table(path, os.path.join(tmp, 'cache'))
+        df = table.to_dataframe()
+        started = time.perf_counter()
+        deck = Deck.from_table(table)
+        build = time.perf_counter() - started
+
+        indices = [(i * 7919) % rows for i in range(lookups)]
+        started = time.perf_counter()
+        for i in indices:
+            row = df.iloc[i]
+            str(row.iloc[1]).strip()
+            str(row.iloc[0]).strip().lower()
+            int(df.index[i])
+        frame_lookup = (time.perf_counter() - started) / lookups
+        started = time.perf_counter()
+        for i in indices:
+            deck.prompts[i]
+            deck.answer_keys[i]
+            deck.ids[i]
+        deck_lookup = (time.perf_counter() - started) / lookups
+
+    frame_bytes = df.memory_usage(deep=True).sum()
+    print(f"{rows} cards: DataFrame {frame_bytes / 2**20:.1f} MiB, Deck {deck.nbytes() / 2**20:.1f} MiB "
+          f"(built in {build * 1000:.0f}ms)")
+    print(f"per-card access: DataFrame {frame_lookup * 1e6:.1f}us, Deck {deck_lookup * 1e6:.2f}us "
+          f"({frame_lookup / deck_lookup:.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Deck model with DataFrame access")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--lookups', type=int, default=20_000)
+    args = parser.parse_args()
+    for rows in args.rows:
+        _bench(rows, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from array import array
+
+import pandas as pd
+
+# Compiled decks live in the user's cache directory, never in the working directory, so
+# running from a checkout or a temporary directory leaves nothing behind there; BAVARD_DECK_CACHE overrides it
+CACHE_DIR = os.environ.get('BAVARD_DECK_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'bavard', 'decks')
+FORMAT_VERSION = 1
+# Cells never contain this, so a whole column can be stored as one joined string
+_SEP = '\x1f'
+
+
+def card_id(cells):
+    """Stable signed 64-bit id of a card, derived from its normalized cells."""
+    digest = hashlib.blake2b(_SEP.join(cells).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class DeckTable:
+    """Every column of a deck CSV as lists of stripped strings, plus one stable id per row."""
+
+    __slots__ = ('path', 'columns', 'data', 'ids', 'sha256')
+
+    def __init__(self, path, columns, data, ids, sha256):
+        self.path = path
+        self.columns = columns
+        self.data = data
+        self.ids = ids
+        self.sha256 = sha256
+
+    def __len__(self):
+        return len(self.ids)
+
+    def column(self, index):
+        return self.data[index]
+
+    def to_dataframe(self):
+        # Card ids become the index so screens working on the frame can still log them
+        return pd.DataFrame(dict(zip(self.columns, self.data)), columns=self.columns,
+                            index=pd.Index(self.ids, dtype='int64', name='card_id'))
+
+
+def _cache_path(path, cache_dir):
+    name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f"{name}.deck")
+
+
+def parse_csv(path, progress=None, chunk_rows=50_000):
+    # One vectorized strip per column instead of a Python converter per cell
+    if progress is None:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        # Streamed in chunks so a caller can show how far through the file we are
+        chunks = []
+        with open(path, 'rb') as f:
+            total = os.fstat(f.fileno()).st_size
+            for chunk in pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+                chunks.append(chunk)
+                progress(min(f.tell(), total), total)
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(path, dtype=str, keep_default_na=False)
+    columns = [str(c) for c in df.columns]
+    data = [df[c].str.strip().str.replace(_SEP, ' ', regex=False).tolist() for c in df.columns]
+    ids = array('q', (card_id(row) for row in zip(*data))) if data else array('q')
+    return columns, data, ids
+
+
+def _write(cache_file, record):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_file)
+
+
+def load_table(path, cache_dir=CACHE_DIR, progress=None):
+    """Load a deck, from its compiled form when the CSV is unchanged.
+
+    The compiled file is keyed by the CSV's absolute path and validated by
+    size and mtime; if those moved but the content hash did not (e.g. a
+    sync tool touched the file) the cache is kept and only re-stamped.
+    `progress(bytes_done, bytes_total)` is called while a CSV is parsed.
+    """
+    st = os.stat(path)
+    cache_file = _cache_path(path, cache_dir)
+    record = None
+    try:
+        with open(cache_file, 'rb') as f:
+            record = pickle.load(f)
+        if record.get('version') != FORMAT_VERSION:
+            record = None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        record = None
+
+    if record is not None and (record['size'], record['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+        sha256 = file_sha256(path)
+        if sha256 == record['sha256']:
+            record['size'], record['mtime_ns'] = st.st_size, st.st_mtime_ns
+            _write(cache_file, record)
+        else:
+            record = None
+
+    if record is None:
+        sha256 = file_sha256(path)
+        columns, data, ids = parse_csv(path, progress)
+        record = {
+            'version': FORMAT_VERSION,
+            'path': os.path.abspath(path),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': sha256,
+            'columns': columns,
+            'data': [_SEP.join(col) for col in data],
+            'rows': len(ids),
+            'ids': ids.tobytes(),
+        }
+        _write(cache_file, record)
+        return DeckTable(path, columns, data, ids, sha256)
+
+    rows = record['rows']
+    data = [col.split(_SEP) if rows else [] for col in record['data']]
+    ids = array('q')
+    ids.frombytes(record['ids'])
+    return DeckTable(path, record['columns'], data, ids, record['sha256'])
+
+
+def _bench(sizes):
+    def legacy(path):
+        strip = lambda x: x.rstrip() if isinstance(x, str) else x
+        df = pd.read_csv(path, converters={0: strip, 1: strip})
+        return df.iloc[:, 1].tolist(), df.iloc[:, 0].tolist()
+
+    print(f"{'rows':>9} {'csv+converters':>15} {'compile':>9} {'warm cache':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        for rows in sizes:
+            path = os.path.join(tmp, f"deck_{rows}.csv")
+            pd.DataFrame({
+                'English': [f"the word number {i} " for i in range(rows)],
+                'French': [f"le mot numéro {i} " for i in range(rows)],
+            }).to_csv(path, index=False)
+            started = time.perf_counter()
+            legacy(path)
+            cold = time.perf_counter() - started
+            started = time.perf_counter()
+            load_table(path, cache_dir)
+            compile_time = time.perf_counter() - started
+            started = time.perf_counter()
+            table = load_table(path, cache_dir)
+            table.column(1), table.column(0)
+            warm = time.perf_counter() - started
+            print(f"{rows:>9} {cold * 1000:>13.1f}ms {compile_time * 1000:>7.1f}ms "
+                  f"{warm * 1000:>9.1f}ms {cold / warm:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled deck cache")
+    parser.add_argument('paths', nargs='*', help='Decks to compile ahead of time')
+    parser.add_argument('--bench', action='store_true', help='Benchmark cold CSV vs warm cache loads')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.sizes)
+    for path in args.paths:
+        table = load_table(path)
+        print(f"{path}: {len(table)} cards, {len(table.columns)} columns")
+
+
+if __name__ == "__main__":
+    main()
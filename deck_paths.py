@@ -0,0 +1,17 @@
+csv_directory = './data/25split/01-12-2023/randomorder'
+
+# Decks listed first in the deck menus, in this order
+pinned_decks = [
+    "./data/25split/01-12-2023/randomorder/list0.csv",
+    "./data/25split/01-12-2023/randomorder/list1.csv",
+    "/Users/pouyan/Documents/Obsidian Vault/français/resources/csv/expressions.csv",
+    "/Users/pouyan/Documents/Obsidian Vault/français/resources/csv/words_2024.csv",
+    # Add more files as needed
+]
+
+# Obsidian vault whose vocabulary tables vault_index.py turns into decks under vault_decks
+vault_directory = "~/Documents/Obsidian Vault/français"
+vault_decks = './data/vault'
+
+# Directory trees indexed by the deck catalog and pre-rendered by prerender.py
+deck_roots = ['./data/25split', vault_decks]
@@ -0,0 +1,159 @@
+import argparse
+import random
+import time
+from array import array
+from collections import Counter
+
+# Leading article -> grammatical gender/number of a French prompt
+ARTICLE_GENDER = {'le': 'm', 'un': 'm', 'du': 'm', 'la': 'f', 'une': 'f', 'les': 'pl', 'des': 'pl'}
+
+# Per card: how many of its rarest n-grams are looked up, how many postings of
+# each are read, how many candidates are scored and how many are kept
+RARE_GRAMS = 4
+POSTING_SCAN = 32
+SCORED = 48
+POOL = 8
+
+
+def gender(text):
+    """'m', 'f' or 'pl' from a normalized prompt's article; '' when it has none (or an elided l')."""
+    return ARTICLE_GENDER.get(text.split(' ', 1)[0], '')
+
+
+def ngrams(text, n=3):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def _postings(keys):
+    postings = {}  # n-gram -> card indices containing it
+    for index, key in enumerate(keys):
+        for gram in ngrams(key):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(index)
+    return postings
+
+
+def _similarity(a, b):
+    return len(a & b) / len(a | b) if a else 0.0
+
+
+class DistractorIndex:
+    """Wrong answers for multiple choice that look like they could be right.
+
+    Character trigram postings of the prompts and answers are built once per
+    deck (see `Deck.distractor_index`). A card's candidates come from the
+    postings of its few rarest shared trigrams, each read up to POSTING_SCAN
+    entries, so finding them costs the same on a 100-card deck as on a 100k
+    one. They are ranked by trigram similarity of the prompt (spelling), of
+    the answer (meaning, roughly), and by sharing the prompt's article; the
+    ranking is kept per card.
+    """
+
+    def __init__(self, prompt_keys, answer_keys):
+        self.prompt_keys = prompt_keys
+        self.answer_keys = answer_keys
+        self.genders = [gender(key) for key in prompt_keys]
+        self._prompt_postings = _postings(prompt_keys)
+        self._answer_postings = _postings(answer_keys)
+        self._pools = {}  # card -> ranked distractor cards
+
+    def __len__(self):
+        return len(self.prompt_keys)
+
+    def _candidates(self, index):
+        counts = Counter()
+        for keys, postings in ((self.prompt_keys, self._prompt_postings), (self.answer_keys, self._answer_postings)):
+            # Rarest first, leaving out trigrams no other card has
+            grams = sorted((gram for gram in ngrams(keys[index]) if len(postings[gram]) > 1),
+                           key=lambda gram: len(postings[gram]))
+            for gram in grams[:RARE_GRAMS]:
+                posting = postings[gram]
+                if len(posting) > POSTING_SCAN:
+                    # A different window per card, so common trigrams don't always offer the same cards
+                    start = (index * 7919) % (len(posting) - POSTING_SCAN)
+                    posting = posting[start:start + POSTING_SCAN]
+                counts.update(posting)
+        return [card for card, _ in counts.most_common(SCORED)]
+
+    def pool(self, index):
+        """Up to POOL distractor cards for card `index`, most plausible first."""
+        pool = self._pools.get(index)
+        if pool is not None:
+            return pool
+        prompt, answer = self.prompt_keys[index], self.answer_keys[index]
+        prompt_grams, answer_grams = ngrams(prompt), ngrams(answer)
+        ranked = []
+        seen = {answer}
+        for card in self._candidates(index):
+            other = self.answer_keys[card]
+            # Another card with the same answer (or prompt) would be a second right choice
+            if other in seen or self.prompt_keys[card] == prompt:
+                continue
+            seen.add(other)
+            score = (_similarity(prompt_grams, ngrams(self.prompt_keys[card]))
+                     + 0.5 * _similarity(answer_grams, ngrams(other))
+                     + (0.5 if self.genders[index] and self.genders[card] == self.genders[index] else 0.0))
+            ranked.append((score, card))
+        ranked.sort(reverse=True)
+        pool = self._pools[index] = [card for _, card in ranked[:POOL]]
+        return pool
+
+    def choices(self, index, count=3, rng=random):
+        """`count` distractors for card `index`, drawn from its best few; padded with random cards on small decks."""
+        pool = self.pool(index)
+        picked = rng.sample(pool[:2 * count], min(count, len(pool[:2 * count])))
+        answers = {self.answer_keys[index]} | {self.answer_keys[card] for card in picked}
+        tries = 0
+        while len(picked) < count and tries < 20 * count:
+            tries += 1
+            card = rng.randrange(len(self))
+            if self.answer_keys[card] not in answers:
+                answers.add(self.answer_keys[card])
+                picked.append(card)
+        return picked
+
+
+def _bench(cards, lookups):
+    rng = random.Random(0)
+    letters = 'etaoinshrdlucmfwypvbgkjqxz'
+
+    def word():
+        return ''.join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+
+    prompts = [f"{rng.choice(list(ARTICLE_GENDER))} {word()}" for _ in range(cards)]
+    answers = [f"the {word()}" for _ in range(cards)]
+    started = time.perf_counter()
+    index = DistractorIndex(prompts, answers)
+    build = time.perf_counter() - started
+    targets = [rng.randrange(cards) for _ in range(lookups)]
+    started = time.perf_counter()
+    for target in targets:
+        index.choices(target, 3, rng)
+    lookup = (time.perf_counter() - started) / lookups
+
+    # What the index saves: scoring every card of the deck against the target
+    started = time.perf_counter()
+    target = targets[0]
+    grams = ngrams(prompts[target])
+    sorted(range(cards), key=lambda card: _similarity(grams, ngrams(prompts[card])))
+    scan = time.perf_counter() - started
+    print(f"{cards} cards: index built in {build * 1000:.0f}ms, "
+          f"{lookup * 1000:.2f}ms per new card vs {scan * 1000:.0f}ms for a linear scan")
+    print(f"  {prompts[target]} / {answers[target]}: "
+          + ", ".join(f"{prompts[c]} / {answers[c]}" for c in index.pool(target)[:3]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark distractor generation for multiple choice")
+    parser.add_argument('--cards', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--lookups', type=int, default=1_000)
+    args = parser.parse_args()
+    for cards in args.cards:
+        _bench(cards, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ import random
 import pandas as pd
 from datetime import datetime
 
+from deck import Deck
+from normalization import normalize_answer
+
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, Static, Button, DataTable, RichLog, Input
 from textual.containers import Container
@@ -183,7 +186,8 @@ class CSVLoaderScreen(Screen):
                 return
             self.app.french_col = french_index
             self.app.english_col = english_index
-            await self.app.push_screen(FlashcardScreen(self.df, french_index, english_index))
+            deck = Deck.from_dataframe(self.df, french_index, english_index, self.file_path)
+            await self.app.push_screen(FlashcardScreen(deck))
 
 
 # ---------------------------
@@ -194,11 +198,9 @@ class FlashcardScreen(Screen):
     
     BINDINGS = [("ctrl+r", "exit_flashcards", "Exit Flashcard Mode")]
 
-    def __init__(self, df, french_col: int, english_col: int) -> None:
+    def __init__(self, deck: Deck) -> None:
         super().__init__()
-        self.df = df
-        self.french_col = french_col
-        self.english_col = english_col
+        self.deck = deck
         self.current_index = 0
         self.word_stats = {}  # For tracking correct/incorrect answers
 
@@ -220,22 +222,20 @@ class FlashcardScreen(Screen):
         self.display_flashcard()
 
     def display_flashcard(self) -> None:
-        if self.current_index >= len(self.df):
+        if self.current_index >= len(self.deck):
             self.current_index = 0  # Restart if at end.
-        row = self.df.iloc[self.current_index]
-        french_word = str(row.iloc[self.french_col]).strip()
+        french_word = self.deck.prompts[self.current_index]
         self.query_one("#flashcard_display", Static).update(f"French: {french_word}")
         self.query_one("#debug_log", RichLog).write(
-            f"[blue]Displaying card {self.current_index+1}/{len(self.df)}[/blue]")
+            f"[blue]Displaying card {self.current_index+1}/{len(self.deck)}[/blue]")
         guess_input = self.query_one("#guess_input", Input)
         guess_input.value = ""
 
     async def on_input_submitted(self, event: Input.Submitted) -> None:
         if event.input.id == "guess_input":
-            guess = event.value.strip().lower()
-            row = self.df.iloc[self.current_index]
-            correct_translation = str(row.iloc[self.english_col]).strip().lower()
-            french_word = str(row.iloc[self.french_col]).strip()
+            guess = normalize_answer(event.value)
+            correct_translation = self.deck.answer_keys[self.current_index]
+            french_word = self.deck.prompts[self.current_index]
             if french_word not in self.word_stats:
                 self.word_stats[french_word] = {'correct': 0, 'incorrect': 0, 'trans_correct': 0, 'trans_incorrect': 0}
             if guess == correct_translation:
@@ -250,9 +250,8 @@ class FlashcardScreen(Screen):
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "show_translation":
-            row = self.df.iloc[self.current_index]
-            correct_translation = str(row.iloc[self.english_col]).strip()
-            french_word = str(row.iloc[self.french_col]).strip()
+            correct_translation = self.deck.answers[self.current_index]
+            french_word = self.deck.prompts[self.current_index]
             self.query_one("#flashcard_display", Static).update(
                 f"French: {french_word}\nEnglish: {correct_translation}")
             self.query_one("#debug_log", RichLog).write("[green]Translation shown.[/green]")
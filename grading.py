@@ -0,0 +1,234 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+EXACT = 'exact'
+TYPO = 'typo'
+CONFUSED = 'confused'
+WRONG = 'wrong'
+
+# kind: one of the above; distance: edits from the expected answer (None when
+# beyond tolerance); other: index of the card whose answer was given instead
+Verdict = namedtuple('Verdict', 'kind distance other')
+
+
+def tolerance(length):
+    """Edits still counted as a typo for an answer of this many characters."""
+    return 0 if length <= 3 else 1 if length <= 7 else 2
+
+
+def edit_distance(a, b):
+    """Levenshtein distance, computed a column of bits at a time (Hyyrö's bit-parallel algorithm)."""
+    m = len(a)
+    if not m:
+        return len(b)
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def _swapped(a, b):
+    """True if b is a with one pair of neighbouring characters swapped."""
+    if len(a) != len(b):
+        return False
+    diff = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+
+
+@lru_cache(maxsize=None)
+def _pieces(length, tol):
+    """(start, size) of the tol + 1 near-equal segments a key of this length is split into."""
+    count = tol + 1
+    base, extra = divmod(length, count)
+    pieces, start = [], 0
+    for i in range(count):
+        size = base + (i >= count - extra)
+        pieces.append((start, size))
+        start += size
+    return tuple(pieces)
+
+
+# Buckets with more keys than this (a segment like "the " that many answers
+# share) are indexed again on what is left of their keys
+SPLIT_AT = 32
+
+
+class _Partitions:
+    """Pass-Join partition filter over (key, payload) items.
+
+    A key of length L allowed t edits is cut into t + 1 segments; a text within
+    t edits leaves at least one of them intact, shifted by at most t. Segments
+    are indexed by (L, segment number), so a lookup probes a few dozen
+    substrings of the text. A crowded bucket holds a nested index over the keys
+    with that segment cut out, searched with the text with the probed substring
+    cut out: their distance is at most the keys' when the segment is intact.
+    """
+
+    def __init__(self, items, tol=None, depth=0):
+        self.tol = tol  # None: by key length, as `tolerance`
+        self._buckets = {}  # (length, segment number) -> {segment text: [(key, payload)] or nested index}
+        for item in items:
+            length = len(item[0])
+            if not length:
+                continue
+            for number, (start, size) in enumerate(_pieces(length, self._tolerance(length))):
+                bucket = self._buckets.get((length, number))
+                if bucket is None:
+                    bucket = self._buckets[(length, number)] = {}
+                bucket.setdefault(item[0][start:start + size], []).append(item)
+        if depth >= 3:
+            return
+        for (length, number), bucket in self._buckets.items():
+            tol = self._tolerance(length)
+            start, size = _pieces(length, tol)[number]
+            if not size or size == length:
+                continue
+            for segment, entries in bucket.items():
+                if len(entries) > SPLIT_AT:
+                    bucket[segment] = _Partitions(
+                        [(key[:start] + key[start + size:], payload) for key, payload in entries], tol, depth + 1)
+
+    def _tolerance(self, length):
+        return tolerance(length) if self.tol is None else self.tol
+
+    def search(self, text, found):
+        """Add to `found` the payloads of keys that may be within tolerance of `text`."""
+        n = len(text)
+        span = 2 if self.tol is None else self.tol
+        for length in range(max(1, n - span), n + span + 1):
+            tol = self._tolerance(length)
+            delta = n - length
+            if abs(delta) > tol:
+                continue
+            for number, (start, size) in enumerate(_pieces(length, tol)):
+                bucket = self._buckets.get((length, number))
+                if not bucket:
+                    continue
+                # Only shifts consistent with this being the first (and last) intact segment
+                for shift in range(max(-number, delta - (tol - number)), min(number, delta + (tol - number)) + 1):
+                    position = start + shift
+                    if position < 0 or position + size > n:
+                        continue
+                    value = bucket.get(text[position:position + size])
+                    if value is None:
+                        continue
+                    if isinstance(value, _Partitions):
+                        value.search(text[:position] + text[position + size:], found)
+                    else:
+                        found.update(payload for _, payload in value)
+
+
+class AnswerIndex:
+    """Finds the deck answers within typo distance of a reply without scanning the deck.
+
+    Built once per deck column (see `Deck.answer_index`). Candidates come from
+    a partition filter and only those get an edit distance computed; a
+    BK-tree would compute tens of thousands per lookup on a 100k-card deck.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self._cards = {}  # key -> first card index with it
+        for index, key in enumerate(keys):
+            self._cards.setdefault(key, index)
+        self._partitions = _Partitions((key, key) for key in self._cards)
+
+    def near(self, text):
+        """{card index: distance} of every answer within its tolerance of `text` (one card per distinct answer)."""
+        candidates = set()
+        self._partitions.search(text, candidates)
+        found = {}
+        for key in candidates:
+            distance = edit_distance(text, key)
+            if distance <= tolerance(len(key)):
+                found[self._cards[key]] = distance
+        return found
+
+    def grade(self, text, index):
+        """Classify normalized reply `text` to card `index`: exact, a typo of it, another card's answer, or wrong."""
+        target = self.keys[index]
+        if text == target:
+            return Verdict(EXACT, 0, None)
+        other = self._cards.get(text)
+        if other is not None:
+            return Verdict(CONFUSED, None, other)
+        distance = edit_distance(text, target)
+        allowed = tolerance(len(target))
+        if allowed and _swapped(text, target):
+            distance = 1  # Swapped neighbours are one slip of the fingers, not two edits
+        elif distance > allowed:
+            distance = None
+        others = [(d, i) for i, d in self.near(text).items() if self.keys[i] != target]
+        # Another card's answer strictly closer than the expected one means the cards were mixed up
+        if others:
+            closest, other = min(others)
+            if distance is None or closest < distance:
+                return Verdict(CONFUSED, None, other)
+        if distance is not None:
+            return Verdict(TYPO, distance, None)
+        return Verdict(WRONG, None, None)
+
+
+def _bench(cards, lookups):
+    rng = random.Random(0)
+    letters = 'etaoinshrdlucmfwypvbgkjqxz'
+    # Mostly single words, some with the article or "to" that many translations share
+    keys = list({rng.choice(['', '', 'the ', 'to '])
+                 + ''.join(rng.choice(letters[:rng.randint(8, 26)]) for _ in range(rng.randint(3, 14)))
+                 for _ in range(cards)})
+    started = time.perf_counter()
+    index = AnswerIndex(keys)
+    build = time.perf_counter() - started
+
+    queries = []
+    for _ in range(lookups):
+        key = list(rng.choice(keys))
+        position = rng.randrange(len(key))
+        key[position] = rng.choice(letters)  # One substitution, usually a typo
+        queries.append(''.join(key))
+    started = time.perf_counter()
+    for i, text in enumerate(queries):
+        index.grade(text, i % len(keys))
+    lookup = (time.perf_counter() - started) / lookups
+
+    sample = queries[:20]
+    started = time.perf_counter()
+    for text in sample:
+        brute = {k for k in keys if edit_distance(text, k) <= tolerance(len(k))}
+        assert brute == {keys[i] for i in index.near(text)}, text
+    scan = (time.perf_counter() - started) / len(sample)
+    print(f"{len(keys)} answers: index built in {build * 1000:.0f}ms, "
+          f"grade {lookup * 1e6:.0f}us per reply vs {scan * 1000:.0f}ms for a full scan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark typo-tolerant answer lookup")
+    parser.add_argument('--cards', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--lookups', type=int, default=2_000)
+    args = parser.parse_args()
+    for cards in args.cards:
+        _bench(cards, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
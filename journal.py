@@ -0,0 +1,344 @@
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sqlite3
+import tempfile
+import threading
+import time
+
+EVENT = 'event'
+SCHEDULE = 'schedule'
+
+EVENT_SQL = ("INSERT INTO events (ts, day, deck, card_id, word, mode, kind, correct, response_ms, session, "
+             "outcome, confused_with) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+SCHEDULE_SQL = "INSERT OR REPLACE INTO schedule VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def write(conn, op, row):
+    """Apply one entry; the caller owns the transaction."""
+    if op == EVENT:
+        conn.execute(EVENT_SQL, row)
+        # Keep the deck catalog's running totals current without re-aggregating events
+        conn.execute(
+            "UPDATE decks SET answers = answers + 1, correct = correct + ?, last_studied = ? WHERE path = ?",
+            (row[7], row[0], row[2]))
+    elif op == SCHEDULE:
+        conn.execute(SCHEDULE_SQL, row)
+
+
+def apply(conn, session, entries):
+    """Write journal entries [(seq, op, row)] to the database in one transaction, marking them applied."""
+    with conn:
+        for _, op, row in entries:
+            write(conn, op, row)
+        conn.execute("INSERT OR REPLACE INTO journals VALUES (?, ?)", (session, entries[-1][0]))
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but belongs to someone else
+    return True
+
+
+def replay(db_path, directory):
+    """Apply what journals of sessions that never closed hold beyond their last applied entry.
+
+    Journals of running processes, this one included, are left alone. A
+    journal is first claimed by renaming it to `<name>.<pid>`, so when several
+    processes start at once only one replays it; a claim whose process died
+    is taken over. The file goes before the applied mark, so a crash in
+    between leaves neither to replay twice. Returns the number of entries
+    recovered.
+    """
+    recovered = 0
+    conn = None
+    paths = glob.glob(os.path.join(directory, '*.jsonl')) + glob.glob(os.path.join(directory, '*.jsonl.*'))
+    for path in sorted(paths):
+        name, _, claimer = os.path.basename(path).partition('.jsonl')
+        session, _, pid = name.rpartition('.')
+        owner = claimer[1:] or pid  # Whoever is writing or replaying it
+        if not pid.isdigit() or not owner.isdigit() or int(owner) == os.getpid() or _alive(int(owner)):
+            continue
+        claimed = os.path.join(directory, f"{name}.jsonl.{os.getpid()}")
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue  # Claimed (or finished) by another process since the directory was listed
+        if conn is None:
+            conn = _connect(db_path)
+        row = conn.execute("SELECT applied FROM journals WHERE session = ?", (session,)).fetchone()
+        applied = row[0] if row else 0
+        entries = []
+        with open(claimed, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    seq, op, values = json.loads(line)
+                except ValueError:
+                    continue  # Cut short by the crash or by a failed write (its entries follow it then)
+                if seq > applied:
+                    entries.append((seq, op, values))
+                    applied = seq  # A batch rewritten after a failed write is only applied once
+        if entries:
+            apply(conn, session, entries)
+            recovered += len(entries)
+        os.remove(claimed)
+        with conn:
+            conn.execute("DELETE FROM journals WHERE session = ?", (session,))
+    if conn is not None:
+        conn.close()
+    return recovered
+
+
+class Journal:
+    """Append-only log of a session's writes, persisted and applied by a background thread.
+
+    `append` only puts the entry on a queue, so answering never waits on the
+    disk. The writer thread takes whatever is queued, appends it as JSON lines
+    to `<directory>/<session>.<pid>.jsonl` and fsyncs straight away; applying
+    to the database is what gets batched, for up to `interval` seconds (or
+    `batch_size` entries), in one transaction that also records the last
+    applied sequence number. If the process dies, `replay` on the next launch
+    applies whatever the journal holds past that number, so nothing written
+    is counted twice. What is lost is what had not been written yet: entries
+    still on the queue when the process died, normally the last few
+    milliseconds of answers (longer only if the disk stalls). A clean `close`
+    drains the queue and removes the file.
+    """
+
+    def __init__(self, db_path, directory, session, batch_size=64, interval=0.25):
+        self.db_path = db_path
+        self.session = session
+        self.path = os.path.join(directory, f"{session}.{os.getpid()}.jsonl")
+        self.batch_size = batch_size
+        self.interval = interval
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        self._seq = itertools.count(1)
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="study-journal", daemon=True)
+        self._worker.start()
+
+    def append(self, op, row):
+        self._queue.put((next(self._seq), op, row))
+
+    def flush(self, timeout=None):
+        """Block until everything appended so far is on disk and in the database.
+
+        Raises the writer's last error if some of it could not be written;
+        those entries are retried with the next batch, and are in the journal
+        file for `replay` if they never make it.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        finished = done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return finished
+
+    def close(self, timeout=None):
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _run(self):
+        conn = None
+        f = None
+        unwritten = []  # appended, not yet in the journal file
+        unapplied = []  # in the journal file, not yet in the database
+        torn = False  # a failed write may have left half a line behind
+        deadline = None
+        closing = False
+        while not closing:
+            try:
+                items = [self._queue.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))]
+            except queue.Empty:
+                items = []  # Interval elapsed: apply what has been written
+            while True:
+                # Everything queued meanwhile shares one write and one fsync
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            waiters = []
+            for item in items:
+                if isinstance(item, tuple):
+                    unwritten.append(item)
+                elif item is None:
+                    closing = True
+                else:
+                    waiters.append(item)
+            if unwritten:
+                try:
+                    if f is None:
+                        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                        f = open(self.path, 'a', encoding='utf-8')
+                    # After a failed write, start on a fresh line in case it left half of one behind
+                    f.write(('\n' if torn else '') + ''.join(
+                        json.dumps(entry, ensure_ascii=False) + '\n' for entry in unwritten))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    torn = False
+                    self.written += len(unwritten)
+                    self.batches += 1
+                    unapplied.extend(unwritten)
+                    unwritten = []
+                    if deadline is None:
+                        deadline = time.monotonic() + self.interval
+                except OSError as e:
+                    # Kept and written again with whatever comes next
+                    torn = True
+                    self.error = e
+            if unapplied and (waiters or closing or not items or len(unapplied) >= self.batch_size):
+                try:
+                    if conn is None:
+                        conn = _connect(self.db_path)
+                    # From the applied mark on, so entries a failed batch left behind go in with this one
+                    apply(conn, self.session, unapplied)
+                    unapplied = []
+                except sqlite3.Error as e:
+                    # Kept and retried with the next batch; the mark in the database stays
+                    # on the last applied entry, so `replay` picks up from there if it comes to that
+                    self.error = e
+                deadline = None
+            if not unwritten and not unapplied:
+                self.error = None
+            for waiter in waiters:
+                waiter.set()
+        if f is not None:
+            f.close()
+        if self.error is None and f is not None:
+            # Everything is in the database; the journal has done its job
+            os.remove(self.path)
+            with conn:
+                conn.execute("DELETE FROM journals WHERE session = ?", (self.session,))
+        if conn is not None:
+            conn.close()
+
+
+def _bench(answers):
+    from study_store import StudyStore
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'study.sqlite3')
+        for journaled in (False, True):
+            store = StudyStore(db_path, journal=journaled)
+            started = time.perf_counter()
+            slowest = 0.0
+            for i in range(answers):
+                before = time.perf_counter()
+                store.record('/deck.csv', f"mot {i}", 'translation', i % 3 != 0, i, 'bench', 500)
+                slowest = max(slowest, time.perf_counter() - before)
+            on_path = (time.perf_counter() - started) / answers
+            store.close()
+            label = 'journal' if journaled else 'direct'
+            print(f"{label:>8}: {on_path * 1e6:.0f}us per answer on the input path, slowest {slowest * 1000:.2f}ms")
+
+
+def _event(session, n):
+    return (time.time(), '2026-01-01', '/deck.csv', n, f"mot {n}", 'check', 'translation', 1, 500, session,
+            'exact', None)
+
+
+def _crash(db_path, directory, session, batches, batch_size, interval):
+    # Child process: journal bursts of answers 0.1s apart, then die without closing 0.1s after the last
+    journal = Journal(db_path, directory, session, batch_size=batch_size, interval=interval)
+    n = 0
+    for count in batches:
+        for _ in range(count):
+            n += 1
+            journal.append(EVENT, _event(session, n))
+        time.sleep(0.1)
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def _replayer(db_path, directory, start, results):
+    start.wait()
+    results.put(replay(db_path, directory))
+
+
+def _check(replayers=4):
+    """Kill sessions with answers pending, then replay concurrently; exits non-zero on a failure."""
+    from study_store import StudyStore
+    cases = [
+        # (description, answers per burst, batch_size, interval)
+        ("killed 0.1s after 10 answers", [10], 64, 0.25),
+        ("killed with a batch applied and one pending", [6, 3], 4, 60.0),
+        ("killed before anything was applied", [5, 5, 5], 64, 60.0),
+    ]
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'study.sqlite3')
+        directory = os.path.join(tmp, 'journal')
+        StudyStore(db_path, journal=False).close()
+        sessions = {}
+        for number, (_, batches, batch_size, interval) in enumerate(cases):
+            session = f"check{number}"
+            child = multiprocessing.Process(target=_crash, args=(db_path, directory, session, batches,
+                                                                 batch_size, interval))
+            child.start()
+            child.join()
+            sessions[session] = sum(batches)
+        conn = sqlite3.connect(db_path)
+        before = dict(conn.execute("SELECT session, COUNT(*) FROM events GROUP BY session"))
+
+        # Several processes replay at once; the rename claim lets exactly one take each journal
+        start, results = multiprocessing.Event(), multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_replayer, args=(db_path, directory, start, results))
+                   for _ in range(replayers)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        recovered = sorted(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+
+        for (description, *_), (session, expected) in zip(cases, sessions.items()):
+            count, distinct = conn.execute("SELECT COUNT(*), COUNT(DISTINCT card_id) FROM events WHERE session = ?",
+                                           (session,)).fetchone()
+            ok = count == distinct == expected
+            failed += not ok
+            print(f"{'ok' if ok else 'FAIL':>4} {description}: {before.get(session, 0)} applied before the crash, "
+                  f"{count} after replay ({distinct} distinct) of {expected}")
+        pending = sum(sessions.values()) - sum(before.values())
+        ok = sum(recovered) == pending and not os.listdir(directory)
+        failed += not ok
+        print(f"{'ok' if ok else 'FAIL':>4} {replayers} concurrent replays recovered {recovered} "
+              f"(expected {pending} in total), {len(os.listdir(directory))} journal file(s) left")
+        conn.close()
+    if failed:
+        raise SystemExit(f"{failed} journal check(s) failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Study journal: replay leftovers, benchmark or check the writer")
+    parser.add_argument('command', choices=['replay', 'bench', 'check'])
+    parser.add_argument('--answers', type=int, default=2_000)
+    args = parser.parse_args()
+    if args.command == 'bench':
+        _bench(args.answers)
+    elif args.command == 'check':
+        _check()
+    else:
+        from study_store import DB_PATH, StudyStore
+        store = StudyStore(DB_PATH)  # Opening the store replays leftover journals
+        print(f"recovered {store.recovered} answer(s) and schedule update(s)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
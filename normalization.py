@@ -0,0 +1,111 @@
+import argparse
+import re
+import time
+import unicodedata
+
+# Two-key accent shortcuts typed on keyboards without dead keys, e.g. "e'" -> "é"
+accents_map = {
+    "e'": "é", "E'": "É",
+    "e`": "è", "E`": "È",
+    "e^": "ê", "E^": "Ê",
+    "a^": "â", "A^": "Â",
+    "a`": "à", "A`": "À",
+    "u`": "ù", "U`": "Ù",
+    "u:": "ü", "U:": "Ü",
+    "i:": "ï", "I:": "Ï",
+    "u^": "û", "U^": "Û",
+    "c,": "ç", "C,": "Ç",
+    # Add more mappings as needed
+}
+
+# All shortcuts in one alternation, longest first, so the input is scanned once
+_ACCENTS = re.compile('|'.join(re.escape(k) for k in sorted(accents_map, key=len, reverse=True)))
+_APOSTROPHES = re.compile(r"\s*['’‘ʼ´`]\s*")
+# Definite, indefinite and partitive articles (du, de la, de l', des). A bare de/d' is the
+# preposition, as in "d'accord" or "de rien", and is part of the answer.
+_ARTICLES = re.compile(r"^(?:(?:le|la|les|un|une|des|du|de la|the|a|an) |l'|de l')")
+_SPACES = re.compile(r'\s+')
+
+
+def replace_accents(text):
+    return _ACCENTS.sub(lambda m: accents_map[m.group()], text)
+
+
+def normalize_answer(text, transliterate=False, strip_articles=False):
+    """Canonical form answers are compared in.
+
+    Optionally expands accent shortcuts first, then: Unicode NFC, lower case,
+    every apostrophe variant folded to ' with no space around it, runs of
+    whitespace collapsed, and optionally a leading article dropped.
+    """
+    if transliterate:
+        text = replace_accents(text)
+    text = unicodedata.normalize('NFC', text).lower()
+    text = _APOSTROPHES.sub("'", text)
+    text = _SPACES.sub(' ', text).strip()
+    if strip_articles:
+        text = _ARTICLES.sub('', text, count=1)
+    return text
+
+
+# (reply, strip_articles, normalized form)
+_CASES = [
+    ("  L'Ho^tel de ville ", False, "l'ho^tel de ville"),
+    ("l’arbre", True, "arbre"),
+    ("la  pomme ", True, "pomme"),
+    ("du pain", True, "pain"),
+    ("de la confiture", True, "confiture"),
+    ("de l'eau", True, "eau"),
+    ("de l’ eau", True, "eau"),
+    ("des pommes", True, "pommes"),
+    ("d'accord", True, "d'accord"),
+    ("D’accord", True, "d'accord"),
+    ("de rien", True, "de rien"),
+    ("du pain", False, "du pain"),
+]
+
+
+def _check():
+    failed = 0
+    for reply, strip_articles, expected in _CASES:
+        got = normalize_answer(reply, strip_articles=strip_articles)
+        ok = got == expected
+        failed += not ok
+        print(f"{'ok' if ok else 'FAIL':>4} {reply!r} -> {got!r}" + ("" if ok else f" (expected {expected!r})"))
+    if failed:
+        raise SystemExit(f"{failed} normalization case(s) failed")
+
+
+def _bench(count):
+    words = ["le chien", "l’arbre", "la  pomme ", "C,a va", "e'te'", "fore^t", "  L'Ho^tel de ville "]
+    inputs = [words[i % len(words)] + str(i % 97) for i in range(count)]
+
+    def loop_replace(text):
+        # The per-entry str.replace loop this module replaces
+        for key, value in accents_map.items():
+            text = text.replace(key, value)
+        return text
+
+    for name, fn in [("str.replace loop", loop_replace), ("compiled pattern", replace_accents),
+                     ("full normalize", lambda t: normalize_answer(t, transliterate=True, strip_articles=True))]:
+        started = time.perf_counter()
+        for text in inputs:
+            fn(text)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>18}: {elapsed / count * 1e6:.2f}us per answer")
+    assert all(loop_replace(t) == replace_accents(t) for t in inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accent transliteration and answer normalization benchmark")
+    parser.add_argument('--count', type=int, default=200_000)
+    parser.add_argument('--check', action='store_true', help='Check the normalized forms of a table of replies instead')
+    args = parser.parse_args()
+    if args.check:
+        _check()
+    else:
+        _bench(args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import io
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+
+class _Clip:
+    __slots__ = ("sound", "stop", "done", "completed")
+
+    def __init__(self, sound):
+        self.sound = sound
+        self.stop = threading.Event()
+        self.done = threading.Event()
+        self.completed = False
+
+
+class AudioPlayer:
+    """Plays clips straight from memory on a background thread.
+
+    Clips are decoded into `pygame.mixer.Sound` objects from their bytes, so
+    nothing touches the disk. Completion is signalled through a
+    `threading.Event` waited on for the clip's exact length rather than by
+    polling `get_busy()`, and `skip` interrupts the current clip immediately.
+    """
+
+    def __init__(self, rate=1.0):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.rate = rate
+        self._queue = queue.Queue()
+        self._current = None
+        self._tail = None  # last clip queued; once it is done the queue has drained
+        self._last = None  # (audio bytes, rate) of the most recently queued clip
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="audio-player", daemon=True)
+        self._worker.start()
+
+    def _decode(self, audio, rate):
+        # Packed clips arrive as ready-made Sounds; anything else is encoded bytes
+        if isinstance(audio, pygame.mixer.Sound):
+            sound = audio
+        else:
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        if rate == 1.0:
+            return sound
+        # Resample by index stepping: faster/slower playback with the matching pitch shift
+        samples = pygame.sndarray.array(sound)
+        positions = np.arange(0, len(samples), rate)
+        resampled = samples[positions.astype(np.intp)]
+        return pygame.sndarray.make_sound(np.ascontiguousarray(resampled))
+
+    def _run(self):
+        while True:
+            clip = self._queue.get()
+            if clip is None:
+                break
+            self._current = clip
+            if clip.stop.is_set():
+                interrupted = True
+            else:
+                channel = clip.sound.play()
+                interrupted = clip.stop.wait(clip.sound.get_length())
+                if interrupted and channel is not None:
+                    channel.stop()
+            self._current = None
+            clip.completed = not interrupted
+            clip.done.set()
+
+    def enqueue(self, audio, rate=None):
+        """Queue a clip behind anything already playing; its `done` event fires when it ends."""
+        rate = self.rate if rate is None else rate
+        self._last = (audio, rate)
+        clip = _Clip(self._decode(audio, rate))
+        self._tail = clip
+        self._queue.put(clip)
+        return clip
+
+    def play(self, audio, rate=None, block=True):
+        """Interrupt whatever is playing and play `audio`. Returns True if it played to the end."""
+        self.clear()
+        clip = self.enqueue(audio, rate)
+        if not block:
+            return False
+        clip.done.wait()
+        return clip.completed
+
+    def replay(self, block=True):
+        if self._last is None:
+            return False
+        audio, rate = self._last
+        return self.play(audio, rate, block)
+
+    def skip(self):
+        """Stop the clip that is currently playing; queued clips still play."""
+        clip = self._current
+        if clip is not None:
+            clip.stop.set()
+
+    def clear(self):
+        """Drop every queued clip and stop the current one."""
+        while True:
+            try:
+                clip = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if clip is not None:
+                clip.done.set()
+        self.skip()
+        # The worker may have dequeued a clip without marking it current yet
+        tail = self._tail
+        if tail is not None and not tail.done.is_set():
+            tail.stop.set()
+
+    def wait(self):
+        """Block until every queued clip has finished or been skipped."""
+        tail = self._tail
+        if tail is not None:
+            tail.done.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.clear()
+        self._queue.put(None)
+        self._worker.join(timeout=1)
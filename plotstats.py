@@ -1,24 +1,167 @@
-import pandas as pd
+import argparse
 import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
+ROLLUP_FILE = 'stats_rollup.pkl'
+ROLLUP_VERSION = 1
+# Sessions beyond the newest KEEP_RECENT are folded into one compacted bucket
+KEEP_RECENT = 50
+COMPACTED = '__compacted__'
+COUNT_COLUMNS = ['Correct', 'Incorrect']
+
+
+def _session_files(directory):
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("flashcard_rich_stats_") and entry.name.endswith(".csv"):
+                st = entry.stat()
+                files[entry.name] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def _read_sessions(directory, names):
+    frames = []
+    for name in names:
+        df = pd.read_csv(os.path.join(directory, name), usecols=lambda c: c in ('Word', *COUNT_COLUMNS))
+        df = df.reindex(columns=['Word', *COUNT_COLUMNS], fill_value=0)
+        df['File'] = name
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['File', 'Word', *COUNT_COLUMNS])
+    df = pd.concat(frames, ignore_index=True)
+    df[COUNT_COLUMNS] = df[COUNT_COLUMNS].fillna(0).astype(np.int64)
+    return df.groupby(['File', 'Word'], as_index=False, sort=False)[COUNT_COLUMNS].sum()
+
+
+def _empty_rollup():
+    return {'version': ROLLUP_VERSION, 'manifest': {}, 'compacted': set(),
+            'rows': pd.DataFrame(columns=['File', 'Word', *COUNT_COLUMNS])}
+
+
+def _load_rollup(path):
+    try:
+        with open(path, 'rb') as f:
+            rollup = pickle.load(f)
+        if rollup.get('version') == ROLLUP_VERSION:
+            return rollup
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+    return _empty_rollup()
+
+
+def _save_rollup(path, rollup):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(rollup, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def update_rollup(directory="stats/", keep_recent=KEEP_RECENT):
+    """Bring the persisted rollup in `directory` up to date and return its per-(file, word) rows.
+
+    Only session files not in the manifest (by name, size and mtime) are read.
+    Sessions older than the newest `keep_recent` are compacted into a single
+    per-word bucket, so the rollup stays about vocabulary-sized however long
+    the history gets. A changed recent file simply replaces its rows; a
+    changed compacted file cannot be subtracted out, so it triggers a rebuild.
+    Session files that were deleted after being ingested keep their counts.
+    """
+    path = os.path.join(directory, ROLLUP_FILE)
+    rollup = _load_rollup(path)
+    files = _session_files(directory)
+    manifest = rollup['manifest']
+
+    changed = [name for name, stat in files.items() if manifest.get(name) != stat]
+    if any(name in rollup['compacted'] for name in changed):
+        rollup = _empty_rollup()
+        manifest = rollup['manifest']
+        changed = list(files)
+    if not changed:
+        return rollup['rows']
+
+    rows = rollup['rows']
+    rows = rows[~rows['File'].isin(changed)]
+    rows = pd.concat([rows, _read_sessions(directory, changed)], ignore_index=True)
+    manifest.update((name, files[name]) for name in changed)
+
+    # Compact: everything but the newest sessions collapses into one bucket per word
+    recent = sorted((name for name in manifest if name not in rollup['compacted']),
+                    key=lambda name: manifest[name][1])
+    old = set(recent[:-keep_recent] if keep_recent else recent)
+    if old:
+        to_fold = rows['File'].isin(old) | (rows['File'] == COMPACTED)
+        folded = rows[to_fold].groupby('Word', as_index=False, sort=False)[COUNT_COLUMNS].sum()
+        folded.insert(0, 'File', COMPACTED)
+        rows = pd.concat([rows[~to_fold], folded], ignore_index=True)
+        rollup['compacted'] |= old
+
+    rollup['rows'] = rows
+    _save_rollup(path, rollup)
+    return rows
+
+
 def combine_stats_files(directory="stats/"):
-    combined_stats = {}  # key: word, value: {'Correct': count, 'Incorrect': count}
+    # key: word, value: {'Correct': count, 'Incorrect': count}
+    rows = update_rollup(directory)
+    totals = rows.groupby('Word', sort=False)[COUNT_COLUMNS].sum()
+    return totals.astype(int).to_dict('index')
+
 
+def _legacy_combine(directory):
+    combined_stats = {}
     for file_name in os.listdir(directory):
         if file_name.startswith("flashcard_rich_stats_") and file_name.endswith(".csv"):
-            file_path = os.path.join(directory, file_name)
-            df = pd.read_csv(file_path)
-
+            df = pd.read_csv(os.path.join(directory, file_name))
             for index, row in df.iterrows():
                 word = row['Word']
                 if word not in combined_stats:
                     combined_stats[word] = {'Correct': 0, 'Incorrect': 0}
                 combined_stats[word]['Correct'] += row['Correct']
                 combined_stats[word]['Incorrect'] += row['Incorrect']
-
     return combined_stats
 
+
+def _bench(sizes, words_per_session=25, vocabulary=2000):
+    rng = np.random.default_rng(0)
+    vocab = np.array([f"mot {i}" for i in range(vocabulary)])
+    print(f"{'sessions':>9} {'full rescan':>12} {'rollup +1 file':>15} {'unchanged':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        written = 0
+
+        def write_session():
+            nonlocal written
+            pd.DataFrame({
+                'Word': rng.choice(vocab, words_per_session, replace=False),
+                'Correct': rng.integers(0, 3, words_per_session),
+                'Incorrect': rng.integers(0, 3, words_per_session),
+            }).to_csv(os.path.join(tmp, f"flashcard_rich_stats_{written:06d}.csv"), index=False)
+            written += 1
+
+        for sessions in sizes:
+            while written < sessions:
+                write_session()
+            combine_stats_files(tmp)
+            write_session()
+            started = time.perf_counter()
+            expected = _legacy_combine(tmp)
+            legacy = time.perf_counter() - started
+            started = time.perf_counter()
+            combine_stats_files(tmp)
+            incremental = time.perf_counter() - started
+            started = time.perf_counter()
+            result = combine_stats_files(tmp)
+            unchanged = time.perf_counter() - started
+            assert result == {w: {k: int(v) for k, v in s.items()} for w, s in expected.items()}
+            print(f"{sessions:>9} {legacy * 1000:>10.1f}ms {incremental * 1000:>13.1f}ms {unchanged * 1000:>8.1f}ms")
+
+
 def plot_stats(stats):
     words = list(stats.keys())
     correct_counts = [stats[word]['Correct'] for word in words]
@@ -103,7 +246,15 @@ def plot_stats(stats):
 
 
 def main():
-    stats = combine_stats_files()
+    parser = argparse.ArgumentParser(description="Plot combined flashcard stats")
+    parser.add_argument('--directory', default='stats/')
+    parser.add_argument('--bench', action='store_true', help='Benchmark a full rescan against the incremental rollup')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 400, 1600])
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.sizes)
+        return
+    stats = combine_stats_files(args.directory)
     plot_stats(stats)
 
 if __name__ == "__main__":
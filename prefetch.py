@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """Synthesizes upcoming cards in the background while the learner is answering.
+
+    `synthesize(word)` must return the clip bytes and store them wherever
+    `is_cached(word)` looks. At most `max_pending` jobs are queued or in
+    flight at once; `schedule` is a no-op for words already cached or pending.
+
+    On the critical path `fetch` counts a *hit* when the clip was already
+    cached, a *wait* when a background job was still running (part of its
+    latency was hidden), and a *miss* when it had to synthesize synchronously.
+    """
+
+    def __init__(self, synthesize, is_cached, workers=2, max_pending=8):
+        self._synthesize = synthesize
+        self._is_cached = is_cached
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._pending = {}  # word -> Future
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.background_seconds = 0.0  # synthesis time spent off the critical path
+        self.wait_seconds = 0.0  # time spent blocked on in-flight background jobs
+        self.miss_seconds = 0.0  # time spent synthesizing on the critical path
+
+    def _run(self, word):
+        if self._cancelled.is_set():
+            return None
+        started = time.perf_counter()
+        try:
+            return self._synthesize(word)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.background_seconds += elapsed
+
+    def _forget(self, word, future):
+        with self._lock:
+            if self._pending.get(word) is future:
+                del self._pending[word]
+
+    def schedule(self, words):
+        if self._cancelled.is_set():
+            return
+        for word in words:
+            with self._lock:
+                if len(self._pending) >= self.max_pending:
+                    return
+                if word in self._pending:
+                    continue
+            if self._is_cached(word):
+                continue
+            future = self._executor.submit(self._run, word)
+            with self._lock:
+                self._pending[word] = future
+            future.add_done_callback(lambda f, w=word: self._forget(w, f))
+
+    def fetch(self, word):
+        """Return the clip for `word`, blocking only if it is not ready yet."""
+        started = time.perf_counter()
+        with self._lock:
+            future = self._pending.get(word)
+        if future is not None:
+            self.waits += 1
+            try:
+                audio = future.result()
+            except Exception:
+                audio = None  # Failed or cancelled; synthesize on the critical path below
+            self.wait_seconds += time.perf_counter() - started
+            if audio is not None:
+                return audio
+            started = time.perf_counter()
+        elif self._is_cached(word):
+            self.hits += 1
+            return self._synthesize(word)
+        else:
+            self.misses += 1
+        audio = self._synthesize(word)
+        self.miss_seconds += time.perf_counter() - started
+        return audio
+
+    def cancel(self):
+        """Drop queued jobs and stop accepting new ones; running jobs finish in the background."""
+        self._cancelled.set()
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self):
+        total = self.hits + self.waits + self.misses
+        hidden = max(0.0, self.background_seconds - self.wait_seconds)
+        return (f"prefetch: {self.hits} hits, {self.waits} waits, {self.misses} misses "
+                f"of {total} cards; ~{hidden:.1f}s of synthesis hidden, "
+                f"{self.wait_seconds + self.miss_seconds:.1f}s spent waiting")
@@ -0,0 +1,160 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeRemainingColumn
+from rich.table import Table
+
+from audio_cache import AudioCache
+from deck_paths import deck_roots, pinned_decks
+from batch_synth import synthesize_chunk
+from deck_cache import load_table
+from tts_engines import audio_ext, cache_engine, engine_spec
+
+console = Console()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pre-render audio for whole decks into the audio cache")
+    parser.add_argument('paths', nargs='*', help='CSV files or directories (default: the pinned decks and the deck roots)')
+    parser.add_argument('--engine', type=engine_spec, default='gtts', help='Speech engine, or comma-separated fallback order (gtts, espeak, tone)')
+    parser.add_argument('--lang', default='fr', help='Language passed to the speech engine')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help='Number of worker processes (connections for gtts)')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Max gtts requests per second')
+    parser.add_argument('--batch', type=int, default=1, metavar='N',
+                        help='Synthesize N words per engine call and split on silence (e.g. 25)')
+    parser.add_argument('--cache-dir', default='audio_cache', help='Audio cache directory shared with the game')
+    parser.add_argument('--max-mb', type=int, default=256, help='Audio cache size cap in megabytes')
+    return parser.parse_args()
+
+
+def find_decks(paths):
+    if not paths:
+        paths = pinned_decks + deck_roots
+    decks = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                decks.extend(os.path.join(root, f) for f in sorted(files) if f.endswith('.csv'))
+        elif os.path.isfile(path):
+            decks.append(path)
+        else:
+            console.print(f"Skipping missing deck: {path}", style="yellow")
+    return decks
+
+
+def read_deck_words(file_path):
+    # Same column and normalization as load_words_from_csv in the game
+    return [w for w in load_table(file_path).column(1) if w]
+
+
+def render_chunk(words, lang, engine):
+    # Runs in a worker; only the bytes travel back, the parent owns the cache
+    started = time.perf_counter()
+    clips, batched = synthesize_chunk(words, lang, engine)
+    return list(zip(words, clips)), batched, time.perf_counter() - started
+
+
+def prerender(decks, engine='gtts', lang='fr', workers=4, cache=None, flush_every=50, rate_limit=None, batch=1):
+    if cache is None:
+        cache = AudioCache()
+    words = []
+    seen = set()
+    for deck in decks:
+        try:
+            deck_words = read_deck_words(deck)
+        except Exception as e:
+            console.print(f"Could not read {deck}: {e}", style="red")
+            continue
+        for word in deck_words:
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+
+    # Resumable: anything already in the cache, from an earlier run or a study session, is skipped
+    todo = [w for w in words if not cache.contains(w, lang, engine=cache_engine(engine))]
+    summary = {'decks': len(decks), 'words': len(words), 'cached': len(words) - len(todo),
+               'rendered': 0, 'failed': [], 'bytes': 0, 'synth_seconds': 0.0, 'calls_saved': 0, 'fallbacks': 0}
+    chunks = [todo[i:i + batch] for i in range(0, len(todo), max(1, batch))]
+    started = time.perf_counter()
+    with Progress(TextColumn("[bold blue]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                  TimeRemainingColumn(), console=console) as progress:
+        task = progress.add_task(f"Rendering with {engine}", total=len(todo))
+        if 'gtts' in engine:
+            # Network-bound: threads sharing one keep-alive pool (and one rate limit) beat processes
+            from tts_http import shared_session
+            shared_session(max_connections=workers, rate_limit=rate_limit)
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        with executor as pool:
+            futures = {pool.submit(render_chunk, chunk, lang, engine): chunk for chunk in chunks}
+            try:
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        clips, batched, elapsed = future.result()
+                    except Exception as e:
+                        summary['failed'].extend((word, str(e)) for word in chunk)
+                    else:
+                        for word, (audio, produced_by) in clips:
+                            # A fallback's clip is kept under its own engine, so the next run retries the first choice
+                            cache.put(word, lang, audio, ext=audio_ext(audio), engine=produced_by)
+                            summary['bytes'] += len(audio)
+                        summary['rendered'] += len(clips)
+                        summary['synth_seconds'] += elapsed
+                        if len(chunk) > 1:
+                            if batched:
+                                summary['calls_saved'] += len(chunk) - 1
+                            else:
+                                summary['fallbacks'] += 1
+                        if summary['rendered'] // flush_every != (summary['rendered'] - len(clips)) // flush_every:
+                            cache.flush()
+                    progress.advance(task, len(chunk))
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                console.print("Interrupted; rendered clips are kept and the next run resumes.", style="yellow")
+            finally:
+                cache.flush()
+    summary['wall_seconds'] = time.perf_counter() - started
+    return summary
+
+
+def show_summary(summary):
+    table = Table(title="Pre-render Summary")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    wall = summary['wall_seconds']
+    rendered = summary['rendered']
+    table.add_row("Decks", str(summary['decks']))
+    table.add_row("Unique words", str(summary['words']))
+    table.add_row("Already cached", str(summary['cached']))
+    table.add_row("Rendered", str(rendered))
+    table.add_row("Failed", str(len(summary['failed'])))
+    table.add_row("Wall time", f"{wall:.1f}s")
+    table.add_row("Throughput", f"{rendered / wall:.1f} clips/s" if wall > 0 else "-")
+    table.add_row("Mean synthesis time per word", f"{summary['synth_seconds'] / rendered * 1000:.0f} ms" if rendered else "-")
+    table.add_row("Engine calls saved by batching", str(summary['calls_saved']))
+    table.add_row("Batches split per word instead", str(summary['fallbacks']))
+    table.add_row("Audio written", f"{summary['bytes'] / 1024:.0f} KiB")
+    console.print(table)
+    for word, error in summary['failed'][:10]:
+        console.print(f"failed: {word!r}: {error}", style="red")
+    if len(summary['failed']) > 10:
+        console.print(f"... and {len(summary['failed']) - 10} more failures", style="red")
+
+
+def main():
+    args = parse_args()
+    decks = find_decks(args.paths)
+    cache = AudioCache(args.cache_dir, max_bytes=args.max_mb * 1024 * 1024, autoflush=False)
+    summary = prerender(decks, engine=args.engine, lang=args.lang, workers=args.workers, cache=cache,
+                        rate_limit=args.rate_limit, batch=args.batch)
+    show_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import os
+import subprocess
+import sys
+import traceback
+import webbrowser
+
+from study_store import DB_PATH, StudyStore
+
+PLOTS_DIR = 'plots'
+FORMATS = ('html', 'png', 'none')
+
+
+def report_path(session, fmt, plots_dir=PLOTS_DIR):
+    return os.path.join(plots_dir, f"session_{session}.{fmt}")
+
+
+def build_figure(word_stats):
+    # plotly is only needed here, so the game itself never imports it
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    words = list(word_stats.keys())
+    correct_counts = [word_stats[word]['correct'] for word in words]
+    incorrect_counts = [word_stats[word]['incorrect'] for word in words]
+    trans_correct_counts = [word_stats[word]['trans_correct'] for word in words]
+    trans_incorrect_counts = [word_stats[word]['trans_incorrect'] for word in words]
+
+    # Create subplots
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Pronunciation", "Translation"))
+
+    # Pronunciation subplot
+    fig.add_trace(go.Bar(x=words, y=correct_counts, name='Correct Pronunciation'), row=1, col=1)
+    fig.add_trace(go.Bar(x=words, y=incorrect_counts, name='Incorrect Pronunciation'), row=1, col=1)
+
+    # Translation subplot
+    fig.add_trace(go.Bar(x=words, y=trans_correct_counts, name='Correct Translation'), row=1, col=2)
+    fig.add_trace(go.Bar(x=words, y=trans_incorrect_counts, name='Incorrect Translation'), row=1, col=2)
+
+    fig.update_layout(title_text="Performance Overview", barmode='group')
+    return fig
+
+
+def render(session, fmt='html', plots_dir=PLOTS_DIR, db_path=DB_PATH, open_browser=True):
+    """Write the report of one session, unless it already exists. Returns its path, or None for an empty session.
+
+    The answers are read back from the study store by session id, so a report
+    can be rendered (again) at any time after the session closed.
+    """
+    path = report_path(session, fmt, plots_dir)
+    if not os.path.exists(path):
+        store = StudyStore(db_path, journal=False)
+        try:
+            word_stats = store.word_stats(session=session)
+        finally:
+            store.close()
+        if not word_stats:
+            return None
+        fig = build_figure(word_stats)
+        os.makedirs(plots_dir, exist_ok=True)
+        # Written under a temporary name first so a half-written report is never taken as cached
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if fmt == 'png':
+            fig.write_image(tmp_path, format='png')
+        else:
+            fig.write_html(tmp_path)
+        os.replace(tmp_path, path)
+    if open_browser and fmt == 'html':
+        webbrowser.open('file://' + os.path.abspath(path))
+    return path
+
+
+def render_in_background(session, fmt='html', plots_dir=PLOTS_DIR, db_path=DB_PATH, open_browser=True):
+    """Start rendering a session's report in a detached process and return where it will be written.
+
+    The caller can exit straight away; the renderer outlives it. Returns None
+    when `fmt` is 'none'.
+    """
+    if fmt == 'none':
+        return None
+    path = report_path(session, fmt, plots_dir)
+    if os.path.exists(path) and not open_browser:
+        return path
+    command = [sys.executable, os.path.abspath(__file__), session,
+               '--format', fmt, '--plots', plots_dir, '--db', db_path]
+    if not open_browser:
+        command.append('--no-open')
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     cwd=os.getcwd(), start_new_session=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the report of a study session")
+    parser.add_argument('session', help='Session id, as recorded in the study store')
+    parser.add_argument('--format', choices=FORMATS[:-1], default='html')
+    parser.add_argument('--plots', default=PLOTS_DIR)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--no-open', action='store_true', help="Don't open an HTML report in the browser")
+    args = parser.parse_args()
+    try:
+        path = render(args.session, args.format, args.plots, args.db, not args.no_open)
+    except Exception:
+        # Usually run detached with no terminal, so failures go next to where the report would be
+        os.makedirs(args.plots, exist_ok=True)
+        with open(os.path.join(args.plots, f"session_{args.session}.log"), 'a', encoding='utf-8') as f:
+            f.write(traceback.format_exc())
+        sys.exit(1)
+    print(path or "no answers recorded in this session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import math
+import random
+import time
+
+
+def error_weight(stats):
+    """Sampling weight of a word from its tallies: smoothed share of wrong answers, 0.5 for unseen words."""
+    if not stats:
+        return 0.5
+    wrong = stats.get('incorrect', 0) + stats.get('trans_incorrect', 0)
+    right = stats.get('correct', 0) + stats.get('trans_correct', 0)
+    return (wrong + 1) / (wrong + right + 2)
+
+
+class WeightedSampler:
+    """Draws indices in proportion to their weights; draws and weight updates are O(1).
+
+    Items are grouped into buckets of weights within a factor of two of each
+    other (by binary exponent). A draw picks a bucket by its total weight (there
+    are only as many buckets as distinct exponents), then members of it
+    uniformly until one is accepted with probability weight / bucket ceiling,
+    which is at least 1/2. Changing a weight moves one item between two buckets with a swap-pop,
+    so there is nothing like an alias table to rebuild after each answer.
+    Items of weight 0 are never drawn.
+    """
+
+    def __init__(self, weights, rng=None):
+        self.rng = rng or random.Random()
+        self.weights = [0.0] * len(weights)
+        self._bucket_of = [None] * len(weights)
+        self._position = [0] * len(weights)
+        self._buckets = {}  # exponent -> list of indices
+        self._totals = {}  # exponent -> summed weight
+        for index, weight in enumerate(weights):
+            self.update(index, weight)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def total(self):
+        return sum(self._totals.values())
+
+    def _remove(self, index):
+        exponent = self._bucket_of[index]
+        if exponent is None:
+            return
+        members = self._buckets[exponent]
+        last = members.pop()
+        if last != index:
+            position = self._position[index]
+            members[position] = last
+            self._position[last] = position
+        if members:
+            self._totals[exponent] -= self.weights[index]
+        else:
+            del self._buckets[exponent]
+            del self._totals[exponent]
+        self._bucket_of[index] = None
+
+    def update(self, index, weight):
+        if weight < 0:
+            raise ValueError("weights must be non-negative")
+        self._remove(index)
+        self.weights[index] = weight
+        if weight == 0:
+            return
+        exponent = math.frexp(weight)[1]
+        members = self._buckets.setdefault(exponent, [])
+        self._position[index] = len(members)
+        members.append(index)
+        self._totals[exponent] = self._totals.get(exponent, 0.0) + weight
+        self._bucket_of[index] = exponent
+
+    def draw(self):
+        if not self._buckets:
+            raise IndexError("no items with positive weight")
+        rng = self.rng
+        target = rng.random() * self.total()
+        for exponent, bucket_total in self._totals.items():
+            target -= bucket_total
+            if target < 0:
+                break
+        members = self._buckets[exponent]
+        ceiling = math.ldexp(1.0, exponent)  # Every member of the bucket weighs less than this
+        # Rejections retry within the bucket: going back to the bucket choice
+        # would skew draws toward buckets whose members sit near their ceiling
+        while True:
+            index = members[int(rng.random() * len(members))]
+            if rng.random() * ceiling < self.weights[index]:
+                return index
+
+
+class ShuffleBag:
+    """Weighted draws without replacement: each card comes up once per bag, heavier cards earlier.
+
+    When the bag is empty it is refilled with the current weights.
+    """
+
+    def __init__(self, weights, rng=None):
+        self.weights = list(weights)
+        self._sampler = WeightedSampler(self.weights, rng)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def update(self, index, weight):
+        # Takes effect now if the card is still in the bag, otherwise from the next bag
+        self.weights[index] = weight
+        if self._sampler.weights[index]:
+            self._sampler.update(index, weight)
+
+    def draw(self):
+        if not self._sampler._buckets:
+            for index, weight in enumerate(self.weights):
+                self._sampler.update(index, weight)
+        index = self._sampler.draw()
+        self._sampler.update(index, 0)
+        return index
+
+
+def _bench(sizes, draws, seed):
+    rng = random.Random(seed)
+    print(f"{'cards':>9} {'build':>9} {'draw':>9} {'update':>9} {'random.choices':>15}")
+    for size in sizes:
+        weights = [rng.random() for _ in range(size)]
+        started = time.perf_counter()
+        sampler = WeightedSampler(weights, random.Random(seed))
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(draws):
+            sampler.draw()
+        draw = (time.perf_counter() - started) / draws
+        started = time.perf_counter()
+        for _ in range(draws):
+            sampler.update(rng.randrange(size), rng.random())
+        update = (time.perf_counter() - started) / draws
+        # The naive alternative rebuilds cumulative weights for every draw after an update
+        started = time.perf_counter()
+        for _ in range(10):
+            rng.choices(range(size), weights=sampler.weights)
+        choices = (time.perf_counter() - started) / 10
+        print(f"{size:>9} {build * 1000:>7.1f}ms {draw * 1e6:>7.2f}us {update * 1e6:>7.2f}us "
+              f"{choices * 1e6:>13.1f}us")
+
+
+def _check(draws, seed):
+    """Chi-square test of draw frequencies against weight / total weight; exits non-zero on a failure."""
+    rng = random.Random(seed)
+    cases = [[0.99, 0.26], [0.5, 0.2, 0.857], [1.0, 0.0, 0.75, 0.3, 0.01, 4.5],
+             [rng.random() for _ in range(50)]]
+    failed = 0
+    for weights in cases:
+        sampler = WeightedSampler(weights, random.Random(seed))
+        counts = [0] * len(weights)
+        for _ in range(draws):
+            counts[sampler.draw()] += 1
+        total = sum(weights)
+        expected = [draws * weight / total for weight in weights]
+        chi2 = sum((count - e) ** 2 / e for count, e in zip(counts, expected) if e)
+        dof = sum(1 for e in expected if e) - 1
+        # Wilson-Hilferty approximation of the chi-square quantile at p = 0.001
+        limit = dof * (1 - 2 / (9 * dof) + 3.09 * math.sqrt(2 / (9 * dof))) ** 3
+        ok = chi2 < limit and all(count == 0 for count, weight in zip(counts, weights) if not weight)
+        failed += not ok
+        shown = ", ".join(f"{count / draws:.3f}/{weight / total:.3f}"
+                          for count, weight in list(zip(counts, weights))[:6])
+        print(f"{'ok' if ok else 'FAIL':>4} chi2 {chi2:8.1f} < {limit:6.1f} ({len(weights)} weights; drawn/expected {shown})")
+    if failed:
+        raise SystemExit(f"{failed} distribution check(s) failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weighted card sampler benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--draws', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help='Test draw frequencies against the weights instead')
+    args = parser.parse_args()
+    if args.check:
+        _check(args.draws, args.seed)
+    else:
+        _bench(args.sizes, args.draws, args.seed)
+
+
+if __name__ == "__main__":
+    main()
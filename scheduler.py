@@ -0,0 +1,130 @@
+import heapq
+import time
+
+DAY = 86400.0
+# A lapsed card comes back after this many seconds, within the same session if it is long enough
+RELEARN_DELAY = 600.0
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+
+class CardState:
+    """SM-2 state of one card. `due` is an epoch timestamp; new cards are due at 0."""
+
+    __slots__ = ('card_id', 'ease', 'interval', 'reps', 'lapses', 'due')
+
+    def __init__(self, card_id, ease=DEFAULT_EASE, interval=0.0, reps=0, lapses=0, due=0.0):
+        self.card_id = card_id
+        self.ease = ease
+        self.interval = interval
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due
+
+    def review(self, quality, now):
+        """Apply an answer graded 0-5 (SM-2): below 3 is a lapse, 3 hard, 4 good, 5 easy."""
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if quality < 3:
+            self.reps = 0
+            self.lapses += 1
+            self.interval = 0.0
+            self.due = now + RELEARN_DELAY
+            return
+        self.reps += 1
+        if self.reps == 1:
+            self.interval = 1.0
+        elif self.reps == 2:
+            self.interval = 6.0
+        else:
+            self.interval = round(self.interval * self.ease, 2)
+        self.due = now + self.interval * DAY
+
+    def as_row(self):
+        return (self.card_id, self.ease, self.interval, self.reps, self.lapses, self.due)
+
+
+def grade(correct_answers, total_answers):
+    # Map how many of a card's prompts were answered right onto the SM-2 0-5 scale
+    if correct_answers == total_answers:
+        return 5 if total_answers > 1 else 4
+    if correct_answers:
+        return 3
+    return 1
+
+
+class Scheduler:
+    """Picks the most overdue card from a heap keyed by due date.
+
+    `next` and `answer` are O(log n). Updated cards are pushed again rather than
+    moved; older heap entries are recognised by their version and skipped when
+    popped. If nothing is due yet the earliest upcoming card is studied ahead,
+    so a session never runs dry. New cards come out in deck order.
+
+    With a `store` and `deck`, saved state is loaded at start and every answer
+    is written back, so due dates carry over between sessions and front-ends.
+    """
+
+    def __init__(self, card_ids, states=None, store=None, deck=None):
+        # states: card_id -> (ease, interval, reps, lapses, due), as saved by the study store
+        if states is None:
+            states = store.load_schedule(deck) if store is not None else {}
+        self.cards = [CardState(card_id, *states.get(card_id, ())) for card_id in card_ids]
+        self.store = store
+        self.deck = deck
+        self._versions = [0] * len(self.cards)
+        # (due, tie-break) each card is queued under; due differs from card.due after `release`
+        self._queued = [(card.due, index) for index, card in enumerate(self.cards)]
+        self._heap = [(due, order, index, 0) for index, (due, order) in enumerate(self._queued)]
+        heapq.heapify(self._heap)
+        self._counter = len(self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def _push(self, index, due, order=None):
+        if order is None:
+            order = self._counter
+            self._counter += 1
+        self._versions[index] += 1
+        self._queued[index] = (due, order)
+        heapq.heappush(self._heap, (due, order, index, self._versions[index]))
+
+    def _pop(self):
+        while self._heap:
+            _, _, index, version = heapq.heappop(self._heap)
+            if version == self._versions[index]:
+                return index
+        raise IndexError("no cards to schedule")
+
+    def next(self):
+        """Take the next card off the schedule; hand it back with `answer` or `release`."""
+        return self._pop()
+
+    def peek(self, count):
+        """The next `count` cards in order, without taking them."""
+        taken = []
+        try:
+            while len(taken) < count:
+                taken.append(self._pop())
+        except IndexError:
+            pass  # Fewer cards queued than asked for
+        for index in taken:
+            self._push(index, *self._queued[index])
+        return taken
+
+    def answer(self, index, quality, now=None):
+        card = self.cards[index]
+        card.review(quality, time.time() if now is None else now)
+        self._push(index, card.due)
+        if self.store is not None:
+            self.store.save_schedule(self.deck, [card.as_row()])
+        return card
+
+    def release(self, index, delay=RELEARN_DELAY, now=None):
+        """Put a card taken with `next` back without grading it, a little later than it was."""
+        now = time.time() if now is None else now
+        self._push(index, max(self.cards[index].due, now + delay))
+
+    def due_count(self, now=None):
+        now = time.time() if now is None else now
+        return sum(1 for card in self.cards if card.due <= now)
@@ -1,4 +1,5 @@
 import os
+import time
 import pandas as pd
 from textual.app import ComposeResult
 from textual.widgets import Header, Footer, Static, Button, DataTable, RichLog, Input
@@ -8,15 +9,22 @@ from textual import events
 
 #from screens.file_picker import FilePickerScreen
 
+# Rows held by the preview widget at once
+PAGE_SIZE = 100
+
 class CSVLoaderScreen(Screen):
     """Screen to load and preview the CSV file, and select French/English columns."""
     
-    BINDINGS = [("r", "return_to_picker", "Return to File Picker")]
+    BINDINGS = [("r", "return_to_picker", "Return to File Picker"),
+                ("]", "next_page", "Next rows"),
+                ("[", "previous_page", "Previous rows")]
 
     def __init__(self, file_path: str) -> None:
         super().__init__()
         self.file_path = file_path
-        self.df = None  # will be set when the CSV is loaded
+        self.table = None  # borrowed from the app's deck cache while the screen is active
+        self.loading = False
+        self.page_start = 0
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -24,11 +32,14 @@ class CSVLoaderScreen(Screen):
         yield Static("", id="selected_file_display")
         yield Button("Change File", id="change_file", variant="warning")
         yield DataTable(id="csv_preview")
+        yield Static("", id="load_status")
         yield Static("Enter French Column (1-indexed):", id="french_prompt")
         yield Input(placeholder="e.g., 2", id="french_col")
         yield Static("Enter English Column (1-indexed):", id="english_prompt")
         yield Input(placeholder="e.g., 1", id="english_col")
         yield Button("Start Flashcards", id="start_flashcards", variant="success")
+        yield Button("Review Due Cards", id="start_review", variant="primary")
+        yield Button("Multiple Choice", id="start_choice", variant="primary")
         yield RichLog(id="debug_log")
         yield Footer()
 
@@ -40,22 +51,82 @@ class CSVLoaderScreen(Screen):
             return
         if not self.file_path.lower().endswith(".csv"):
             self.query_one("#debug_log", RichLog).write(f"[yellow]Warning: File is not a CSV: {self.file_path}[/yellow]")
+        self.loading = True
+        self.run_worker(self.load_csv, thread=True, exclusive=True)
+
+    def load_csv(self) -> None:
+        # Runs on a worker thread; every UI update is handed back with call_from_thread
+        started = time.perf_counter()
+        try:
+            head = pd.read_csv(self.file_path, dtype=str, keep_default_na=False, nrows=PAGE_SIZE)
+        except Exception as e:
+            self.app.call_from_thread(self.load_failed, e)
+            return
+        self.app.call_from_thread(self.show_head, [str(c) for c in head.columns],
+                                  head.to_numpy().tolist(), time.perf_counter() - started)
+        last_report = [0.0]
+
+        def progress(done: int, total: int) -> None:
+            now = time.perf_counter()
+            if now - last_report[0] > 0.1 or done >= total:
+                last_report[0] = now
+                self.app.call_from_thread(self.show_progress, done, total)
+
         try:
-            self.df = pd.read_csv(self.file_path)
-            self.query_one("#debug_log", RichLog).write("[green]CSV loaded successfully.[/green]")
+            table = self.app.decks.table(self.file_path, progress)
         except Exception as e:
-            self.query_one("#debug_log", RichLog).write(f"[red]Error loading CSV: {e}[/red]")
+            self.app.call_from_thread(self.load_failed, e)
+            return
+        self.app.call_from_thread(self.table_loaded, table, time.perf_counter() - started)
+
+    def load_failed(self, error: Exception) -> None:
+        self.loading = False
+        self.query_one("#load_status", Static).update("Load failed.")
+        self.query_one("#debug_log", RichLog).write(f"[red]Error loading CSV: {error}[/red]")
+
+    def show_head(self, columns: list, rows: list, elapsed: float) -> None:
+        if self.table is None:
+            self.fill_preview(columns, rows, 0, None)
+        self.query_one("#debug_log", RichLog).write(
+            f"[blue]First {len(rows)} rows shown after {elapsed * 1000:.0f} ms.[/blue]")
+
+    def show_progress(self, done: int, total: int) -> None:
+        self.query_one("#load_status", Static).update(
+            f"Loading... {done / 2**20:.1f} of {total / 2**20:.1f} MiB ({done / max(total, 1):.0%})")
+
+    def table_loaded(self, table, elapsed: float) -> None:
+        self.loading = False
+        self.table = table
+        self.query_one("#debug_log", RichLog).write(
+            f"[green]CSV loaded successfully: {len(table)} rows in {elapsed:.2f} s.[/green]")
+        self.query_one("#debug_log", RichLog).write(f"[blue]Deck cache: {self.app.decks.summary()}[/blue]")
+        self.show_page(self.page_start)
+
+    def show_page(self, start: int) -> None:
+        """Put rows [start, start + PAGE_SIZE) in the preview; only one page is ever held by the widget."""
+        if self.table is None:
             return
-        num_cols = min(5, self.df.shape[1])
-        preview_df = self.df.iloc[:100, :num_cols]
+        start = max(0, min(start, max(len(self.table) - 1, 0) // PAGE_SIZE * PAGE_SIZE))
+        num_cols = min(5, len(self.table.columns))
+        rows = zip(*(self.table.column(i)[start:start + PAGE_SIZE] for i in range(num_cols)))
+        self.fill_preview(self.table.columns[:num_cols], list(rows), start, len(self.table))
+
+    def fill_preview(self, columns: list, rows: list, start: int, total) -> None:
+        self.page_start = start
         table: DataTable = self.query_one("#csv_preview", DataTable)
         table.clear(columns=True)
-        for col in preview_df.columns:
+        for col in columns[:5]:
             table.add_column(str(col))
-        for _, row in preview_df.iterrows():
-            table.add_row(*[str(item) for item in row])
-        self.query_one("#debug_log", RichLog).write(
-            f"[blue]Preview loaded: {preview_df.shape[0]} rows, {preview_df.shape[1]} columns.[/blue]")
+        table.add_rows(row[:5] for row in rows)
+        of = f"{total}" if total is not None else "?"
+        self.query_one("#load_status", Static).update(
+            f"Rows {start + 1}-{start + len(rows)} of {of}  (\\[ and ] to page)")
+
+    def action_next_page(self) -> None:
+        self.show_page(self.page_start + PAGE_SIZE)
+
+    def action_previous_page(self) -> None:
+        self.show_page(self.page_start - PAGE_SIZE)
 
     def action_return_to_picker(self) -> None:
         self.query_one("#debug_log", RichLog).write("[yellow]Returning to FilePickerScreen...[/yellow]")
@@ -65,7 +136,7 @@ class CSVLoaderScreen(Screen):
         if event.button.id == "change_file":
             # Instead of awaiting directly, schedule the return action:
             self.call_later(self.action_return_to_picker)
-        elif event.button.id == "start_flashcards":
+        elif event.button.id in ("start_flashcards", "start_review", "start_choice"):
             try:
                 french_index = int(self.query_one("#french_col", Input).value.strip()) - 1
                 english_index = int(self.query_one("#english_col", Input).value.strip()) - 1
@@ -74,18 +145,48 @@ class CSVLoaderScreen(Screen):
             except ValueError:
                 self.query_one("#debug_log", RichLog).write("[red]Error: Invalid column numbers.[/red]")
                 return
-            if self.df is None:
-                self.query_one("#debug_log", RichLog).write("[red]Error: CSV not loaded properly.[/red]")
+            if self.table is None:
+                if self.loading:
+                    self.query_one("#debug_log", RichLog).write("[yellow]Still loading the CSV, try again in a moment.[/yellow]")
+                else:
+                    self.query_one("#debug_log", RichLog).write("[red]Error: CSV not loaded properly.[/red]")
                 return
-            if french_index < 0 or french_index >= self.df.shape[1] or english_index < 0 or english_index >= self.df.shape[1]:
+            num_cols = len(self.table.columns)
+            if french_index < 0 or french_index >= num_cols or english_index < 0 or english_index >= num_cols:
                 self.query_one("#debug_log", RichLog).write("[red]Error: Column numbers out of range.[/red]")
                 return
             self.app.french_col = french_index
             self.app.english_col = english_index
+            if event.button.id == "start_choice":
+                from screens.multiple_choice import MultipleChoiceScreen
+                self.app.push_screen(MultipleChoiceScreen(self.file_path, french_index, english_index))
+                return
             from screens.flashcard import FlashcardScreen
-            self.app.push_screen(FlashcardScreen(self.df, french_index, english_index))
+            self.app.push_screen(FlashcardScreen(self.file_path, french_index, english_index,
+                                                 scheduled=event.button.id == "start_review"))
 
 
-    def on_suspend(self) -> None:
+    def on_screen_suspend(self) -> None:
+        # The deck stays in the app's cache; coming back is a cache hit, not a re-parse
         self.query_one("#debug_log", RichLog).write("[yellow]CSVLoaderScreen suspended, releasing state...[/yellow]")
-        self.df = None
+        self.table = None
+
+    def on_screen_resume(self) -> None:
+        # Borrowing again is usually a cache hit, but a miss (evicted, or the file changed)
+        # parses on a worker; while the first load is still running the worker will deliver it
+        if self.table is None and not self.loading and self.is_mounted and os.path.exists(self.file_path):
+            self.loading = True
+            self.run_worker(self.borrow_table, thread=True, exclusive=True)
+
+    def borrow_table(self) -> None:
+        try:
+            table = self.app.decks.table(self.file_path)
+        except Exception as e:
+            self.app.call_from_thread(self.load_failed, e)
+            return
+        self.app.call_from_thread(self.table_borrowed, table)
+
+    def table_borrowed(self, table) -> None:
+        self.loading = False
+        self.table = table
+        self.query_one("#debug_log", RichLog).write(f"[blue]Deck cache: {self.app.decks.summary()}[/blue]")
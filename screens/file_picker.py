@@ -1,5 +1,6 @@
 import os
 import time
+from functools import partial
 from textual.app import ComposeResult
 from textual.widgets import Header, Footer, Static, Button, DataTable, RichLog
 from textual.containers import Container
@@ -8,14 +9,26 @@ from textual import events
 
 # Import CSVLoaderScreen from the csv_loader module.
 from screens.csv_loader import CSVLoaderScreen
+from catalog import DeckCatalog, accuracy
+from deck_paths import vault_directory
+
+# directory -> (mtime_ns, [(name, is_dir), ...]) sorted directories first; shared by every picker
+_listings = {}
+# Rows handed to the table per UI update, so huge directories appear progressively
+BATCH_SIZE = 500
 
 class FilePickerScreen(Screen):
     """Screen for browsing directories and selecting a CSV file."""
     
     def __init__(self) -> None:
         super().__init__()
-        self.current_dir = os.path.expanduser("~/Documents/Obsidian Vault/français")
+        self.current_dir = os.path.expanduser(vault_directory)
         self.selected_file = None
+        self.csv_only = False
+        self.catalog_entries = None  # set while the table lists the deck catalog instead of a directory
+        self.pending = None
+        self.shown = None  # (directory, mtime_ns, csv_only) of the listing fully in the table
+        self.generation = 0  # Bumped per load so rows from an outdated scan are dropped
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -25,6 +38,8 @@ class FilePickerScreen(Screen):
         with Container():
             yield Button("Up", id="up_button", variant="warning")
             yield Button("Select", id="select_button", variant="success")
+            yield Button("CSV Only: Off", id="csv_filter_button")
+            yield Button("Deck Catalog", id="catalog_button", variant="primary")
         yield RichLog(id="debug_log")
         yield Footer()
 
@@ -35,8 +50,10 @@ class FilePickerScreen(Screen):
         self.last_click_row = None
         self.query_one("#debug_log", RichLog).write("[green]FilePickerScreen mounted.[/green]")
 
-    def on_resume(self) -> None:
-        # When resuming, reload the directory and reset focus and click state.
+    def on_screen_resume(self) -> None:
+        # When resuming, refresh the listing (a no-op if the directory is unchanged) and reset focus and click state.
+        if not self.is_mounted:
+            return
         self.load_directory(self.current_dir)
         self.query_one("#file_table", DataTable).focus()
         self.last_click_time = 0
@@ -44,25 +61,119 @@ class FilePickerScreen(Screen):
         self.query_one("#debug_log", RichLog).write("[green]FilePickerScreen resumed.[/green]")
 
     def load_directory(self, directory: str) -> None:
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError as e:
+            self.query_one("#debug_log", RichLog).write(f"[red]Error reading directory: {e}[/red]")
+            return
         self.current_dir = directory
+        self.catalog_entries = None
         self.query_one("#current_dir", Static).update(f"Current Directory: {self.current_dir}")
+        view = (directory, mtime_ns, self.csv_only)
+        if view == self.shown or view == self.pending:
+            return  # The table already shows (or is being filled with) exactly this listing
+        self.shown = None
+        self.pending = view
+        self.generation += 1
         table: DataTable = self.query_one("#file_table", DataTable)
         table.clear(columns=True)
         table.add_column("Name")
         table.add_column("Type")
+        self.run_worker(partial(self.scan_directory, view, self.generation), thread=True, exclusive=True)
+
+    def scan_directory(self, view: tuple, generation: int) -> None:
+        # Worker thread: one scandir pass, cached per directory mtime, streamed to the table in batches
+        directory, mtime_ns, csv_only = view
+        cached = _listings.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            items = cached[1]
+            source = "cache"
+        else:
+            try:
+                with os.scandir(directory) as entries:
+                    # d_type from the directory read answers is_dir without a stat per entry
+                    items = [(entry.name, entry.is_dir()) for entry in entries]
+            except OSError as e:
+                self.app.call_from_thread(self.scan_failed, e, generation)
+                return
+            items.sort(key=lambda item: (not item[1], item[0].lower()))
+            _listings[directory] = (mtime_ns, items)
+            source = "disk"
+        if csv_only:
+            items = [item for item in items if item[1] or item[0].lower().endswith(".csv")]
+        rows = [(name, "Directory" if is_dir else "File") for name, is_dir in items]
+        for start in range(0, len(rows), BATCH_SIZE):
+            self.app.call_from_thread(self.add_rows, rows[start:start + BATCH_SIZE], generation)
+        self.app.call_from_thread(self.scan_done, view, generation, len(rows), source)
+
+    def add_rows(self, rows: list, generation: int) -> None:
+        if generation == self.generation:
+            self.query_one("#file_table", DataTable).add_rows(rows)
+
+    def scan_done(self, view: tuple, generation: int, count: int, source: str) -> None:
+        if generation != self.generation:
+            return
+        self.shown = view
+        self.pending = None
+        self.query_one("#debug_log", RichLog).write(f"[blue]Loaded directory: {view[0]} ({count} entries, from {source})[/blue]")
+
+    def scan_failed(self, error: Exception, generation: int) -> None:
+        if generation == self.generation:
+            self.pending = None
+            self.query_one("#debug_log", RichLog).write(f"[red]Error reading directory: {error}[/red]")
+
+    def show_catalog(self) -> None:
+        self.generation += 1
+        self.shown = self.pending = None
+        self.query_one("#current_dir", Static).update("Deck Catalog (Up returns to the directory)")
+        self.query_one("#file_table", DataTable).clear()
+        self.run_worker(partial(self.refresh_catalog, self.generation), thread=True, exclusive=True)
+
+    def refresh_catalog(self, generation: int) -> None:
+        # Worker thread with its own connection; only changed directories and decks are re-read
         try:
-            items = os.listdir(directory)
-            self.query_one("#debug_log", RichLog).write(f"[blue]Loaded directory: {directory}[/blue]")
+            catalog = DeckCatalog()
         except Exception as e:
-            self.query_one("#debug_log", RichLog).write(f"[red]Error reading directory: {e}[/red]")
+            self.app.call_from_thread(self.catalog_failed, e, generation)
+            return
+        try:
+            try:
+                updated, gone = catalog.refresh()
+            except Exception as e:
+                # The decks indexed before are still listed, once the user knows they may be out of date
+                self.app.call_from_thread(self.catalog_failed, e, generation)
+                updated = gone = None
+            entries = catalog.entries
+        finally:
+            catalog.close()
+        self.app.call_from_thread(self.fill_catalog, entries, updated, gone, generation)
+
+    def catalog_failed(self, error: Exception, generation: int) -> None:
+        if generation == self.generation:
+            self.notify(f"Could not refresh the deck catalog: {error}", title="Deck catalog", severity="error")
+            self.query_one("#debug_log", RichLog).write(f"[red]Error refreshing the deck catalog: {error}[/red]")
+
+    def fill_catalog(self, entries: list, updated, gone, generation: int) -> None:
+        if generation != self.generation:
             return
-        items = sorted(items, key=lambda x: (not os.path.isdir(os.path.join(directory, x)), x.lower()))
-        for item in items:
-            full_path = os.path.join(directory, item)
-            item_type = "Directory" if os.path.isdir(full_path) else "File"
-            table.add_row(item, item_type)
+        self.catalog_entries = entries
+        rows = []
+        for entry in entries:
+            acc = accuracy(entry)
+            rows.append((entry.name, f"Deck, {entry.rows} cards" + (f", {acc:.0%} correct" if acc is not None else "")))
+        table: DataTable = self.query_one("#file_table", DataTable)
+        table.clear()
+        table.add_rows(rows)
+        self.query_one("#debug_log", RichLog).write(
+            f"[blue]Deck catalog: {len(entries)} decks ({updated} re-indexed, {gone} removed)[/blue]" if updated is not None
+            else f"[yellow]Deck catalog: {len(entries)} decks, as last indexed[/yellow]")
 
     def _process_selection(self, row_index: int) -> None:
+        if self.catalog_entries is not None:
+            if 0 <= row_index < len(self.catalog_entries):
+                self.selected_file = self.catalog_entries[row_index].path
+                self.query_one("#debug_log", RichLog).write(f"[green]Selected file: {self.selected_file}[/green]")
+            return
         table: DataTable = self.query_one("#file_table", DataTable)
         row = table.get_row_at(row_index)
         if not row:
@@ -98,10 +209,18 @@ class FilePickerScreen(Screen):
                 self.last_click_row = table.cursor_row
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        if event.button.id == "up_button":
+        if event.button.id == "up_button" and self.catalog_entries is not None:
+            self.load_directory(self.current_dir)
+        elif event.button.id == "catalog_button":
+            self.show_catalog()
+        elif event.button.id == "up_button":
             parent = os.path.dirname(self.current_dir)
             if parent and parent != self.current_dir:
                 self.load_directory(parent)
+        elif event.button.id == "csv_filter_button":
+            self.csv_only = not self.csv_only
+            event.button.label = f"CSV Only: {'On' if self.csv_only else 'Off'}"
+            self.load_directory(self.current_dir)
         elif event.button.id == "select_button":
             if self.selected_file:
                 self.query_one("#debug_log", RichLog).write(f"[green]File selected: {self.selected_file}[/green]")
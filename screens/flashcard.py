@@ -1,6 +1,9 @@
-import os
-from datetime import datetime
-import pandas as pd
+import sqlite3
+import time
+from grading import CONFUSED, EXACT, TYPO
+from normalization import normalize_answer
+from scheduler import Scheduler, grade
+from study_store import TRANSLATION
 from textual.app import ComposeResult
 from textual.widgets import Header, Footer, Static, Button, RichLog, Input
 from textual.containers import Container
@@ -12,11 +15,17 @@ class FlashcardScreen(Screen):
     
     BINDINGS = [("ctrl+r", "exit_flashcards", "Exit Flashcard Mode")]
 
-    def __init__(self, df: pd.DataFrame, french_col: int, english_col: int) -> None:
+    def __init__(self, file_path: str, french_col: int, english_col: int, scheduled: bool = False) -> None:
         super().__init__()
-        self.df = df
+        self.file_path = file_path
         self.french_col = french_col
         self.english_col = english_col
+        # French prompts and English answers, borrowed from the app's deck cache while active
+        self.deck = None
+        self.scheduled = scheduled
+        self.scheduler = None
+        self.answered = False
+        self.ready = False  # Set once the deck has been borrowed and the first card shown
         self.current_index = 0
         self.word_stats = {}  # For tracking correct/incorrect answers
 
@@ -34,66 +43,124 @@ class FlashcardScreen(Screen):
         yield Footer()
 
     async def on_mount(self) -> None:
-        self.query_one("#debug_log", RichLog).write("[blue]FlashcardScreen mounted.[/blue]")
+        self.query_one("#debug_log", RichLog).write(f"[blue]{type(self).__name__} mounted.[/blue]")
+        self.query_one("#flashcard_display", Static).update("Loading deck...")
+        self.run_worker(self.load_deck, thread=True, exclusive=True)
+
+    def load_deck(self) -> None:
+        # Runs on a worker thread: a deck that has to be parsed (or built) doesn't freeze the UI
+        started = time.perf_counter()
+        try:
+            deck = self.app.decks.deck(self.file_path, self.french_col, self.english_col)
+            self.prepare(deck)
+        except Exception as e:
+            self.app.call_from_thread(self.load_failed, e)
+            return
+        self.app.call_from_thread(self.deck_ready, deck, time.perf_counter() - started)
+
+    def prepare(self, deck) -> None:
+        """Per-deck work done on the loading worker before the first card is shown."""
+        # Built once per deck and kept with it in the app's deck cache, so grading stays a lookup
+        deck.answer_index
+
+    def load_failed(self, error: Exception) -> None:
+        self.query_one("#flashcard_display", Static).update("Could not load the deck.")
+        self.query_one("#debug_log", RichLog).write(f"[red]Error loading deck: {error}[/red]")
+
+    def deck_ready(self, deck, elapsed: float) -> None:
+        self.deck = deck
+        log = self.query_one("#debug_log", RichLog)
+        log.write(f"[blue]Deck cache: {self.app.decks.summary()}[/blue]")
+        if self.ready:
+            return  # Borrowed again after a resume; the session carries on where it was
+        self.ready = True
+        log.write(f"[blue]Deck ready in {elapsed * 1000:.0f} ms.[/blue]")
+        if self.scheduled:
+            # Review mode: cards come in due order and share due dates with the CLI game
+            self.scheduler = Scheduler(self.deck.ids, store=self.app.store, deck=self.deck.path)
+            self.current_index = self.scheduler.next()
+            log.write(f"[blue]{self.scheduler.due_count()} of {len(self.scheduler)} cards due.[/blue]")
         self.display_flashcard()
 
     def display_flashcard(self) -> None:
-        if self.current_index >= len(self.df):
+        if self.current_index >= len(self.deck):
             self.current_index = 0  # Restart if at end.
-        row = self.df.iloc[self.current_index]
-        french_word = str(row.iloc[self.french_col]).strip()
+        french_word = self.deck.prompts[self.current_index]
         self.query_one("#flashcard_display", Static).update(f"French: {french_word}")
-        self.query_one("#debug_log", RichLog).write(f"[blue]Displaying card {self.current_index+1}/{len(self.df)}[/blue]")
+        self.query_one("#debug_log", RichLog).write(f"[blue]Displaying card {self.current_index+1}/{len(self.deck)}[/blue]")
         guess_input = self.query_one("#guess_input", Input)
         guess_input.value = ""
+        self.shown_at = time.perf_counter()
+        self.answered = False
 
     async def on_input_submitted(self, event: Input.Submitted) -> None:
-        if event.input.id == "guess_input":
-            guess = event.value.strip().lower()
-            row = self.df.iloc[self.current_index]
-            correct_translation = str(row.iloc[self.english_col]).strip().lower()
-            french_word = str(row.iloc[self.french_col]).strip()
+        if event.input.id == "guess_input" and self.deck is not None:
+            index = self.current_index
+            verdict = self.deck.answer_index.grade(normalize_answer(event.value), index)
+            correct_translation = self.deck.answers[index]
+            french_word = self.deck.prompts[index]
             if french_word not in self.word_stats:
                 self.word_stats[french_word] = {'correct': 0, 'incorrect': 0, 'trans_correct': 0, 'trans_incorrect': 0}
-            if guess == correct_translation:
-                self.word_stats[french_word]['correct'] += 1
-                self.query_one("#debug_log", RichLog).write(f"[green]Correct! {french_word} -> {correct_translation}[/green]")
+            correct = verdict.kind in (EXACT, TYPO)
+            response_ms = int((time.perf_counter() - self.shown_at) * 1000)
+            self.app.store.record(self.deck.path, french_word, TRANSLATION, correct,
+                                  self.deck.ids[index], 'textual', response_ms, outcome=verdict.kind,
+                                  confused_with=self.deck.ids[verdict.other] if verdict.other is not None else None)
+            log = self.query_one("#debug_log", RichLog)
+            self.word_stats[french_word]['correct' if correct else 'incorrect'] += 1
+            if verdict.kind == EXACT:
+                log.write(f"[green]Correct! {french_word} -> {correct_translation}[/green]")
+            elif verdict.kind == TYPO:
+                log.write(f"[yellow]Correct, with a typo: {french_word} -> {correct_translation}. Your answer: {event.value}[/yellow]")
+            elif verdict.kind == CONFUSED:
+                log.write(f"[red]Incorrect! {event.value} is {self.deck.prompts[verdict.other]}; "
+                          f"{french_word} -> {correct_translation}[/red]")
             else:
-                self.word_stats[french_word]['incorrect'] += 1
-                self.query_one("#debug_log", RichLog).write(f"[red]Incorrect! {french_word} -> {correct_translation}. Your answer: {event.value}[/red]")
+                log.write(f"[red]Incorrect! {french_word} -> {correct_translation}. Your answer: {event.value}[/red]")
+            if self.scheduler is not None and not self.answered:
+                card = self.scheduler.answer(index, grade(int(correct), 1))
+                self.query_one("#debug_log", RichLog).write(
+                    f"[blue]Next review in {card.interval:g} day(s).[/blue]" if card.interval
+                    else "[blue]This card will come back soon.[/blue]")
+            self.answered = True
             event.input.value = ""
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
+        if self.deck is None and event.button.id != "save_stats":
+            return  # Still loading
         if event.button.id == "show_translation":
-            row = self.df.iloc[self.current_index]
-            correct_translation = str(row.iloc[self.english_col]).strip()
-            french_word = str(row.iloc[self.french_col]).strip()
+            correct_translation = self.deck.answers[self.current_index]
+            french_word = self.deck.prompts[self.current_index]
             self.query_one("#flashcard_display", Static).update(f"French: {french_word}\nEnglish: {correct_translation}")
             self.query_one("#debug_log", RichLog).write("[green]Translation shown.[/green]")
         elif event.button.id == "next_card":
-            self.current_index += 1
+            if self.scheduler is not None:
+                if not self.answered:
+                    self.scheduler.release(self.current_index)
+                self.current_index = self.scheduler.next()
+            else:
+                self.current_index += 1
             self.display_flashcard()
         elif event.button.id == "save_stats":
-            self.save_results()
-            self.query_one("#debug_log", RichLog).write("[blue]Stats saved.[/blue]")
-
-    def save_results(self) -> None:
-        stats_dir = "stats_textual_app"
-        os.makedirs(stats_dir, exist_ok=True)
-        records = []
-        for word, stats in self.word_stats.items():
-            records.append({
-                "Word": word,
-                "Correct": stats.get("correct", 0),
-                "Incorrect": stats.get("incorrect", 0),
-                "Trans Correct": stats.get("trans_correct", 0),
-                "Trans Incorrect": stats.get("trans_incorrect", 0)
-            })
-        if records:
-            df_stats = pd.DataFrame(records)
-            date_str = datetime.now().strftime("%T_%d_%m_%Y").replace(":", "-")
-            file_path = os.path.join(stats_dir, f"stats_{date_str}.csv")
-            df_stats.to_csv(file_path, index=False)
+            self.run_worker(self.flush_stats, thread=True)
+
+    def flush_stats(self) -> None:
+        # Answers are journaled as they happen; this waits for the writer off the UI thread, then reports
+        try:
+            self.app.store.flush()
+        except (OSError, sqlite3.Error) as e:
+            self.app.call_from_thread(self.save_results, e)
+        else:
+            self.app.call_from_thread(self.save_results)
+
+    def save_results(self, error: Exception = None) -> None:
+        if error is not None:
+            self.query_one("#debug_log", RichLog).write(
+                f"[red]Could not save stats ({error}); they are kept in the journal and retried.[/red]")
+        elif self.word_stats:
+            answers = sum(stats['correct'] + stats['incorrect'] for stats in self.word_stats.values())
+            self.query_one("#debug_log", RichLog).write(
+                f"[blue]Stats saved: {answers} answers for {len(self.word_stats)} words in {self.app.store.path}[/blue]")
         else:
             self.query_one("#debug_log", RichLog).write("[yellow]No stats to save.[/yellow]")
 
@@ -101,7 +168,11 @@ class FlashcardScreen(Screen):
         self.query_one("#debug_log", RichLog).write("[yellow]Exiting flashcard mode...[/yellow]")
         await self.app.pop_screen()
 
-    async def on_suspend(self) -> None:
-        # Clear heavy state if necessary.
-        self.df = None
-        self.word_stats.clear()
+    def on_screen_resume(self) -> None:
+        # Before the first load finishes, its worker delivers the deck
+        if self.deck is None and self.ready and self.is_mounted:
+            self.run_worker(self.load_deck, thread=True, exclusive=True)
+
+    def on_screen_suspend(self) -> None:
+        # Only the deck is released; the position and session tallies survive
+        self.deck = None
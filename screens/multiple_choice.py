@@ -0,0 +1,90 @@
+import random
+import time
+from grading import CONFUSED, EXACT
+from scheduler import grade
+from screens.flashcard import FlashcardScreen
+from study_store import TRANSLATION
+from textual.app import ComposeResult
+from textual.widgets import Header, Footer, Static, Button, RichLog
+from textual.containers import Container
+
+# Buttons on screen: the right answer and CHOICES - 1 distractors
+CHOICES = 4
+
+class MultipleChoiceScreen(FlashcardScreen):
+    """Flashcards answered by picking the translation among look-alike ones from the same deck."""
+
+    BINDINGS = FlashcardScreen.BINDINGS + [(str(n + 1), f"choose({n})", f"Choice {n + 1}") for n in range(CHOICES)]
+
+    def __init__(self, file_path: str, french_col: int, english_col: int, scheduled: bool = False) -> None:
+        super().__init__(file_path, french_col, english_col, scheduled)
+        self.options = []  # card index shown on each choice button
+        self.rng = random.Random()
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield Static("Multiple Choice", classes="title")
+        yield Static("", id="flashcard_display")
+        with Container(id="choices"):
+            for n in range(CHOICES):
+                yield Button("", id=f"choice_{n}")
+        with Container():
+            yield Button("Next Card", id="next_card", variant="success")
+            yield Button("Save Stats", id="save_stats", variant="warning")
+        yield Static("Press 1-4 to answer, Ctrl+R to exit", id="exit_instructions")
+        yield RichLog(id="debug_log")
+        yield Footer()
+
+    def prepare(self, deck) -> None:
+        # The n-gram index is built once per deck and kept with it in the app's deck cache
+        deck.distractor_index
+
+    def display_flashcard(self) -> None:
+        if self.current_index >= len(self.deck):
+            self.current_index = 0  # Restart if at end.
+        index = self.current_index
+        self.options = self.deck.distractor_index.choices(index, CHOICES - 1, self.rng) + [index]
+        self.rng.shuffle(self.options)
+        self.query_one("#flashcard_display", Static).update(f"French: {self.deck.prompts[index]}")
+        for n, button in enumerate(self.query("#choices Button").results(Button)):
+            button.display = n < len(self.options)
+            if n < len(self.options):
+                button.label = f"{n + 1}. {self.deck.answers[self.options[n]]}"
+                button.variant = "default"
+        self.query_one("#debug_log", RichLog).write(f"[blue]Displaying card {index+1}/{len(self.deck)}[/blue]")
+        self.shown_at = time.perf_counter()
+        self.answered = False
+
+    def action_choose(self, n: int) -> None:
+        if self.deck is None or self.answered or n >= len(self.options):
+            return
+        index, chosen = self.current_index, self.options[n]
+        correct = chosen == index
+        french_word = self.deck.prompts[index]
+        if french_word not in self.word_stats:
+            self.word_stats[french_word] = {'correct': 0, 'incorrect': 0, 'trans_correct': 0, 'trans_incorrect': 0}
+        self.word_stats[french_word]['correct' if correct else 'incorrect'] += 1
+        response_ms = int((time.perf_counter() - self.shown_at) * 1000)
+        self.app.store.record(self.deck.path, french_word, TRANSLATION, correct,
+                              self.deck.ids[index], 'textual-choice', response_ms,
+                              outcome=EXACT if correct else CONFUSED,
+                              confused_with=None if correct else self.deck.ids[chosen])
+        buttons = list(self.query("#choices Button").results(Button))
+        buttons[self.options.index(index)].variant = "success"
+        log = self.query_one("#debug_log", RichLog)
+        if correct:
+            log.write(f"[green]Correct! {french_word} -> {self.deck.answers[index]}[/green]")
+        else:
+            buttons[n].variant = "error"
+            log.write(f"[red]Incorrect! {self.deck.answers[chosen]} is {self.deck.prompts[chosen]}; "
+                      f"{french_word} -> {self.deck.answers[index]}[/red]")
+        if self.scheduler is not None:
+            card = self.scheduler.answer(index, grade(int(correct), 1))
+            log.write(f"[blue]Next review in {card.interval:g} day(s).[/blue]" if card.interval
+                      else "[blue]This card will come back soon.[/blue]")
+        self.answered = True
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        # Textual also calls FlashcardScreen's handler, which takes care of the other buttons
+        if event.button.id and event.button.id.startswith("choice_"):
+            self.action_choose(int(event.button.id.split("_")[1]))
@@ -0,0 +1,160 @@
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from deck_cache import CACHE_DIR, load_table
+from study_store import StudyStore
+
+RANK_VERSION = 1
+WORD_COLUMN = 1
+
+# (deck sha256, history version) -> (order, scores); the on-disk copy serves later runs
+_rankings = {}
+
+
+def history_version(store):
+    # Events are only ever appended, or replaced wholesale by a re-import, so this moves on any change
+    store.catch_up()  # Answers still in the session's journal count too
+    return tuple(store.conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM events").fetchone())
+
+
+def _history(store):
+    """Answer tallies keyed two ways: by card id, and by word for imported events that have no card id."""
+    # Two queries rather than one frame with a nullable id column, which pandas would turn
+    # into float64 and so lose the low bits of 64-bit ids
+    by_card = pd.read_sql_query(
+        "SELECT card_id, COUNT(*) - SUM(correct) AS wrong, COUNT(*) AS attempts "
+        "FROM events WHERE card_id IS NOT NULL GROUP BY card_id", store.conn, index_col='card_id')
+    by_word = pd.read_sql_query(
+        "SELECT word, COUNT(*) - SUM(correct) AS wrong, COUNT(*) AS attempts "
+        "FROM events WHERE card_id IS NULL GROUP BY word", store.conn, index_col='word')
+    return by_card, by_word
+
+
+def difficulty(table, store):
+    """Smoothed error rate of every card, in deck order: (wrong + 1) / (attempts + 2), 0.5 when unseen."""
+    by_card, by_word = _history(store)
+    ids = pd.Index(np.frombuffer(table.ids, dtype=np.int64), name='card_id')
+    counts = by_card.reindex(ids, fill_value=0).to_numpy(dtype=np.float64)
+    if len(by_word) and len(table.columns) > WORD_COLUMN:
+        counts += by_word.reindex(table.column(WORD_COLUMN), fill_value=0).to_numpy(dtype=np.float64)
+    return (counts[:, 0] + 1) / (counts[:, 1] + 2)
+
+
+def _rank_path(sha256, cache_dir):
+    return os.path.join(cache_dir, f"{sha256}.rank")
+
+
+def _ranking(table, store, cache_dir):
+    key = (table.sha256, history_version(store))
+    cached = _rankings.get(key)
+    if cached is not None:
+        return cached
+    path = _rank_path(table.sha256, cache_dir)
+    try:
+        with open(path, 'rb') as f:
+            record = pickle.load(f)
+        if record.get('version') == RANK_VERSION and record['key'] == key:
+            cached = record['order'], record['scores']
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, KeyError):
+        pass
+    if cached is None:
+        scores = difficulty(table, store)
+        # Hardest first; the stable sort keeps deck order between equally hard cards
+        order = np.argsort(-scores, kind='stable')
+        cached = order, scores[order]
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': RANK_VERSION, 'key': key, 'order': order, 'scores': cached[1]},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    _rankings[key] = cached
+    return cached
+
+
+def order_by_stats(file_path, store=None, cache_dir=CACHE_DIR):
+    """Return (scores, df): the deck hardest card first, with its difficulty scores.
+
+    `df` keeps the deck's card ids as its index and `scores` is a Series on the
+    same index. Rankings are cached per deck content and history version, in
+    memory and next to the compiled deck, so an unchanged deck with no new
+    answers is not ranked again.
+    """
+    own_store = store is None
+    if own_store:
+        store = StudyStore()
+    try:
+        table = load_table(file_path, cache_dir)
+        order, scores = _ranking(table, store, cache_dir)
+    finally:
+        if own_store:
+            store.close()
+    df = table.to_dataframe().iloc[order]
+    return pd.Series(scores, index=df.index, name='difficulty'), df
+
+
+def _bench(cards, sessions, words_per_session=25):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = os.path.join(tmp, 'deck.csv')
+        pd.DataFrame({
+            'English': [f"word {i}" for i in range(cards)],
+            'French': [f"mot {i}" for i in range(cards)],
+        }).to_csv(deck, index=False)
+        store = StudyStore(os.path.join(tmp, 'study.sqlite3'))
+        table = load_table(deck, tmp)
+        ids = np.frombuffer(table.ids, dtype=np.int64)
+        words = table.column(WORD_COLUMN)
+        rows = []
+        for session in range(sessions):
+            for index in rng.choice(cards, words_per_session, replace=False):
+                # A third of the history predates card ids, like imported legacy CSVs
+                card = None if session % 3 == 0 else int(ids[index])
+                rows.append((float(session), '2024-01-01', deck, card, words[index], 'bench',
+                             'translation', int(rng.random() < 0.7), None, str(session)))
+        with store.conn:
+            store.conn.executemany(
+                "INSERT INTO events (ts, day, deck, card_id, word, mode, kind, correct, response_ms, session) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        _rankings.clear()
+        started = time.perf_counter()
+        scores, df = order_by_stats(deck, store, tmp)
+        cold = time.perf_counter() - started
+        _rankings.clear()
+        started = time.perf_counter()
+        order_by_stats(deck, store, tmp)
+        disk = time.perf_counter() - started
+        started = time.perf_counter()
+        order_by_stats(deck, store, tmp)
+        warm = time.perf_counter() - started
+        store.close()
+    print(f"{cards} cards, {sessions} sessions ({len(rows)} answers): "
+          f"ranked {cold * 1000:.0f}ms, from disk {disk * 1000:.0f}ms, in memory {warm * 1000:.0f}ms")
+    print(f"hardest: {df.iloc[0, WORD_COLUMN]} ({scores.iloc[0]:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank a deck by past difficulty")
+    parser.add_argument('paths', nargs='*', help='Decks to rank')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--bench', action='store_true', help='Benchmark ranking a large synthetic deck')
+    parser.add_argument('--cards', type=int, default=100_000)
+    parser.add_argument('--sessions', type=int, default=3_000)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.cards, args.sessions)
+    for path in args.paths:
+        scores, df = order_by_stats(path)
+        print(path)
+        for score, word in zip(scores.head(args.top), df.iloc[:args.top, WORD_COLUMN]):
+            print(f"  {score:.2f}  {word}")
+
+
+if __name__ == "__main__":
+    main()
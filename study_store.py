@@ -0,0 +1,326 @@
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+from journal import EVENT, SCHEDULE, Journal, replay, write
+
+DB_PATH = os.path.join('stats', 'study.sqlite3')
+
+PRONUNCIATION = 'pronunciation'
+TRANSLATION = 'translation'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    deck TEXT NOT NULL,
+    card_id INTEGER,
+    word TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    response_ms INTEGER,
+    session TEXT,
+    outcome TEXT,
+    confused_with INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_word ON events(word, kind);
+CREATE INDEX IF NOT EXISTS events_card ON events(card_id);
+CREATE INDEX IF NOT EXISTS events_deck ON events(deck, ts);
+CREATE INDEX IF NOT EXISTS events_day ON events(day);
+CREATE TABLE IF NOT EXISTS schedule (
+    deck TEXT NOT NULL,
+    card_id INTEGER NOT NULL,
+    ease REAL NOT NULL,
+    interval REAL NOT NULL,
+    reps INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    due REAL NOT NULL,
+    PRIMARY KEY (deck, card_id)
+);
+CREATE TABLE IF NOT EXISTS decks (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    answers INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    last_studied REAL
+);
+CREATE INDEX IF NOT EXISTS decks_dir ON decks(dir);
+CREATE TABLE IF NOT EXISTS catalog_dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS catalog_dirs_parent ON catalog_dirs(parent);
+CREATE TABLE IF NOT EXISTS journals (
+    session TEXT PRIMARY KEY,
+    applied INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+# Legacy per-session aggregate CSVs: (glob, mode recorded for the imported events, column -> kind)
+LEGACY_SOURCES = [
+    (os.path.join('stats', 'date_*.csv'), 'cli',
+     {'Correct': (PRONUNCIATION, 1), 'Incorrect': (PRONUNCIATION, 0),
+      'Trans Correct': (TRANSLATION, 1), 'Trans Incorrect': (TRANSLATION, 0)}),
+    (os.path.join('stats', 'flashcard_rich_stats_*.csv'), 'flashcard-rich',
+     {'Correct': (TRANSLATION, 1), 'Incorrect': (TRANSLATION, 0)}),
+    # The Textual app counted translation guesses in its Correct/Incorrect columns
+    (os.path.join('stats_textual_app', 'stats_*.csv'), 'textual',
+     {'Correct': (TRANSLATION, 1), 'Incorrect': (TRANSLATION, 0),
+      'Trans Correct': (TRANSLATION, 1), 'Trans Incorrect': (TRANSLATION, 0)}),
+]
+
+_FILE_DATE = re.compile(r'(\d{2})-(\d{2})-(\d{2})_(\d{2})_(\d{2})_(\d{4})')
+
+
+def _legacy_timestamp(path):
+    # File names embed strftime('%T_%d_%m_%Y') with ':' replaced by '-'
+    match = _FILE_DATE.search(os.path.basename(path))
+    if match:
+        hh, mi, ss, dd, mo, yyyy = map(int, match.groups())
+        try:
+            return datetime(yyyy, mo, dd, hh, mi, ss).timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(path)
+
+
+class StudyStore:
+    """Indexed SQLite log of individual answers, shared by the CLI game and the Textual app.
+
+    With `journal` (the default) answers and schedule updates go through a
+    `journal.Journal`: recording only queues them, a background thread makes
+    them durable and applies them in batches, and opening the store replays
+    journals left behind by sessions that crashed. Every read first waits for
+    the writer to apply what is queued, so it sees the answer just recorded.
+    """
+
+    def __init__(self, path=DB_PATH, journal=True):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if 'outcome' not in columns:
+            # Databases from before answers were classified
+            with self.conn:
+                self.conn.execute("ALTER TABLE events ADD COLUMN outcome TEXT")
+                self.conn.execute("ALTER TABLE events ADD COLUMN confused_with INTEGER")
+        self.session = uuid.uuid4().hex
+        self.journal = None
+        self.recovered = 0
+        if journal:
+            directory = os.path.join(os.path.dirname(path) or '.', 'journal')
+            self.recovered = replay(path, directory)
+            self.journal = Journal(path, directory, self.session)
+
+    def record(self, deck, word, kind, correct, card_id=None, mode='cli', response_ms=None, ts=None,
+               outcome=None, confused_with=None):
+        """Log one answer. `outcome` is the grading.Verdict kind and `confused_with` the id of the card answered instead."""
+        ts = time.time() if ts is None else ts
+        day = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+        row = (ts, day, deck, card_id, word, mode, kind, int(bool(correct)), response_ms, self.session,
+               outcome, confused_with)
+        if self.journal is not None:
+            self.journal.append(EVENT, row)
+        else:
+            with self.conn:
+                write(self.conn, EVENT, row)
+
+    def flush(self):
+        """Wait until every answer recorded so far is in the database.
+
+        Raises the journal writer's OSError or sqlite3.Error when it could not
+        get them there; they are retried, and recovered on the next launch at
+        the latest.
+        """
+        if self.journal is not None:
+            self.journal.flush()
+
+    def catch_up(self):
+        """Apply what the journal still holds before a read; callers querying `conn` directly do this first.
+
+        Unlike `flush` it doesn't raise: a failed write is left for `flush` to
+        report, and the read sees what did reach the database.
+        """
+        if self.journal is not None:
+            try:
+                self.journal.flush()
+            except (OSError, sqlite3.Error):
+                pass
+
+    def word_stats(self, deck=None, words=None, session=None):
+        """Per-word tallies in the {'correct', 'incorrect', 'trans_correct', 'trans_incorrect'} shape the front-ends use."""
+        self.catch_up()
+        sql = ("SELECT word, "
+               "SUM(kind = 'pronunciation' AND correct), SUM(kind = 'pronunciation' AND NOT correct), "
+               "SUM(kind = 'translation' AND correct), SUM(kind = 'translation' AND NOT correct) "
+               "FROM events")
+        clauses, params = [], []
+        if deck is not None:
+            clauses.append("deck = ?")
+            params.append(deck)
+        if session is not None:
+            clauses.append("session = ?")
+            params.append(session)
+        wanted = None
+        if words is not None:
+            words = list(words)
+            if len(words) <= 500:
+                clauses.append(f"word IN ({','.join('?' * len(words))})")
+                params.extend(words)
+            else:
+                wanted = set(words)  # Too many for one IN list; filter the grouped rows instead
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY word"
+        return {word: {'correct': c, 'incorrect': i, 'trans_correct': tc, 'trans_incorrect': ti}
+                for word, c, i, tc, ti in self.conn.execute(sql, params)
+                if wanted is None or word in wanted}
+
+    def deck_stats(self):
+        """Per deck: (answers, accuracy, last studied timestamp)."""
+        self.catch_up()
+        rows = self.conn.execute(
+            "SELECT deck, COUNT(*), AVG(correct), MAX(ts) FROM events GROUP BY deck")
+        return {deck: (count, accuracy, last) for deck, count, accuracy, last in rows}
+
+    def day_stats(self, deck=None):
+        """Per day: (answers, accuracy, mean response ms)."""
+        self.catch_up()
+        sql = "SELECT day, COUNT(*), AVG(correct), AVG(response_ms) FROM events"
+        params = []
+        if deck is not None:
+            sql += " WHERE deck = ?"
+            params.append(deck)
+        sql += " GROUP BY day ORDER BY day"
+        return {day: (count, accuracy, response) for day, count, accuracy, response in self.conn.execute(sql, params)}
+
+    def outcome_stats(self, deck=None):
+        """Answers per grading outcome (exact, typo, confused, wrong), and which cards get mixed up most.
+
+        Returns (counts, confusions) with confusions a list of (card_id, confused_with, times).
+        """
+        self.catch_up()
+        where, params = ("WHERE deck = ?", [deck]) if deck is not None else ("", [])
+        counts = dict(self.conn.execute(
+            f"SELECT outcome, COUNT(*) FROM events {where} {'AND' if where else 'WHERE'} outcome IS NOT NULL "
+            "GROUP BY outcome", params))
+        confusions = self.conn.execute(
+            f"SELECT card_id, confused_with, COUNT(*) AS times FROM events {where} "
+            f"{'AND' if where else 'WHERE'} confused_with IS NOT NULL "
+            "GROUP BY card_id, confused_with ORDER BY times DESC LIMIT 20", params).fetchall()
+        return counts, confusions
+
+    def load_schedule(self, deck):
+        """Spaced-repetition state of a deck: card_id -> (ease, interval, reps, lapses, due)."""
+        self.catch_up()
+        rows = self.conn.execute(
+            "SELECT card_id, ease, interval, reps, lapses, due FROM schedule WHERE deck = ?", (deck,))
+        return {card_id: state for card_id, *state in rows}
+
+    def save_schedule(self, deck, rows):
+        """Upsert (card_id, ease, interval, reps, lapses, due) rows for a deck."""
+        if self.journal is not None:
+            for row in rows:
+                self.journal.append(SCHEDULE, (deck, *row))
+            return
+        with self.conn:
+            for row in rows:
+                write(self.conn, SCHEDULE, (deck, *row))
+
+    def import_legacy_csvs(self, root='.'):
+        """Turn the old per-session aggregate CSVs into events, once per file. Returns the number of files imported."""
+        import pandas as pd
+        imported = 0
+        for pattern, mode, columns in LEGACY_SOURCES:
+            for path in sorted(glob.glob(os.path.join(root, pattern))):
+                st = os.stat(path)
+                key = os.path.relpath(path, root)
+                seen = self.conn.execute(
+                    "SELECT size, mtime_ns FROM imported_files WHERE path = ?", (key,)).fetchone()
+                if seen == (st.st_size, st.st_mtime_ns):
+                    continue
+                try:
+                    df = pd.read_csv(path)
+                except ValueError:
+                    df = None  # Empty or not a CSV at all
+                if df is None or 'Word' not in df.columns:
+                    # Not a stats file; remembered so it isn't parsed again on every launch
+                    with self.conn:
+                        self.conn.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?)",
+                                          (key, st.st_size, st.st_mtime_ns))
+                    continue
+                ts = _legacy_timestamp(path)
+                day = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+                rows = []
+                for column, (kind, correct) in columns.items():
+                    if column not in df.columns:
+                        continue
+                    counts = df[column].fillna(0).astype(int)
+                    for word, count in zip(df['Word'].astype(str), counts):
+                        rows.extend([(ts, day, '', None, word, mode, kind, correct, None, f"import:{key}")] * count)
+                with self.conn:
+                    # A re-imported (edited) file replaces its earlier events
+                    self.conn.execute("DELETE FROM events WHERE session = ?", (f"import:{key}",))
+                    self.conn.executemany(
+                        "INSERT INTO events (ts, day, deck, card_id, word, mode, kind, correct, response_ms, session) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    self.conn.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?)",
+                                      (key, st.st_size, st.st_mtime_ns))
+                imported += 1
+        return imported
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Study event store")
+    parser.add_argument('command', choices=['import', 'words', 'decks', 'days', 'outcomes'])
+    parser.add_argument('--deck', default=None, help='Restrict words/days to one deck (absolute path)')
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+    store = StudyStore(args.db)
+    if args.command == 'import':
+        print(f"imported {store.import_legacy_csvs()} file(s)")
+    elif args.command == 'words':
+        for word, stats in sorted(store.word_stats(args.deck).items()):
+            print(word, stats)
+    elif args.command == 'decks':
+        for deck, (count, accuracy, last) in store.deck_stats().items():
+            print(f"{deck or '(imported)'}: {count} answers, {accuracy:.0%} correct, last {datetime.fromtimestamp(last):%Y-%m-%d}")
+    elif args.command == 'outcomes':
+        counts, confusions = store.outcome_stats(args.deck)
+        print(", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) or "no graded answers")
+        for card_id, other, times in confusions:
+            print(f"card {card_id} answered as card {other}: {times}x")
+    else:
+        for day, (count, accuracy, response) in store.day_stats(args.deck).items():
+            response = f", {response:.0f} ms" if response is not None else ""
+            print(f"{day}: {count} answers, {accuracy:.0%} correct{response}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,142 +1,138 @@
-from datetime import datetime
+import atexit
 import os
 import random
-import pandas as pd
-from gtts import gTTS
 import pygame
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
 import random
 import argparse
+import threading
+import time
+from datetime import datetime
 import stats_combine as st
+from audio_cache import AudioCache
+from card_order import ScheduledOrder, WeightedOrder, make_order
+from sampler import error_weight
+from scheduler import Scheduler, grade
+from grading import CONFUSED, EXACT, TYPO
+from prefetch import Prefetcher
+from playback import AudioPlayer
+from deck_paths import csv_directory
+from catalog import DeckCatalog, accuracy
+from deck import Deck, load_deck
+from normalization import normalize_answer
+from study_store import PRONUNCIATION, TRANSLATION, StudyStore
+from batch_synth import synthesize_batch
+from audio_pack import AudioPack, pack_path_for
+from tts_engines import audio_ext, backend_metrics, cache_engine, engine_spec, synthesize_named
+
+from report import FORMATS, render_in_background
 
 #import plotext as plt
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 # Initialize Rich console
 console = Console()
 
 # Initialize pygame mixer
 pygame.mixer.init()
 
-accents_map = {
-    "e'": "é", "E'": "É",
-    "e`": "è", "E`": "È",
-    "e^": "ê", "E^": "Ê",
-    "a^": "â", "A^": "Â",
-    "a`": "à", "A`": "À",
-    "u`": "ù", "U`": "Ù",
-    "u:": "ü", "U:": "Ü",
-    "i:": "ï", "I:": "Ï",
-    "u^": "û", "U^": "û",
-    "c,": "ç", "C,": "Ç",
-    # Add more mappings as needed
-}
-csv_directory = './data/25split/01-12-2023/randomorder'
-
-file_options = {
-    1: "aRandomSet.csv",
-    2: "./data/25split/01-12-2023/randomorder/list0.csv",
-    3: "./data/25split/01-12-2023/randomorder/list1.csv",
-    4: "/Users/pouyan/Documents/Obsidian Vault/français/resources/csv/expressions.csv",
-    5: "/Users/pouyan/Documents/Obsidian Vault/français/resources/csv/words_2024.csv"
-    # Add more files as needed
-}
+# Synthesized clips are cached on disk so repeat cards never hit gTTS again
+audio_cache = AudioCache('audio_cache')
+atexit.register(audio_cache.flush)
 
-def replace_accents(text):
-    for key, value in accents_map.items():
-        text = text.replace(key, value)
-    return text
+# Clips are played from memory on a background thread
+player = AudioPlayer()
 
 def parse_args():
     parser = argparse.ArgumentParser(description="French Word Pronunciation Game")
     parser.add_argument('--no-random', action='store_true', help='Disable word randomization')
     parser.add_argument('--backward', action='store_true', help='Run through list in reverse order')
     parser.add_argument('--stats', action='store_true', help='Run through the list based on previous statistcal performance')
+    parser.add_argument('--schedule', action='store_true', help='Spaced repetition: most overdue cards first, due dates kept between sessions')
+    parser.add_argument('--sampling', choices=['weighted', 'bag', 'uniform'], default='weighted',
+                        help='Random mode: weighted by error rate, weighted without repeats until the deck is done, or uniform')
+    parser.add_argument('--ignore-articles', action='store_true', help='Accept answers with or without a leading article (le, la, l\', the, ...)')
+    parser.add_argument('--report', choices=FORMATS, default='html',
+                        help='Session report rendered in the background on exit: html (opened in the browser), png or none')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the random order, for reproducible sessions')
+    parser.add_argument('--rate', type=float, default=1.0, help='Playback rate, e.g. 0.8 for slower audio')
+    parser.add_argument('--slow', type=float, default=1.0, help='Speed of packed clips without changing pitch, e.g. 0.75')
+    parser.add_argument('--engine', type=engine_spec, default='gtts', help='Speech engine, or comma-separated fallback order (gtts, espeak, tone)')
+    parser.add_argument('--batch', action='store_true', help='Synthesize the deck in 25-word chunks in the background (one engine call per chunk); replaces --prefetch')
+    parser.add_argument('--prefetch', type=int, default=3, help='Number of upcoming cards to synthesize in the background (0 disables)')
     return parser.parse_args()
 
 ## A simple list of French words with articles. You can expand this list.
 #french_words = ['le chien', 'la pomme', 'l\'arbre']
 
 
-def get_random_csv_file_path(directory):
-    # List all CSV files in the specified directory
-    files = [f for f in os.listdir(directory) if f.endswith('.csv')]
-    # Choose a random file
-    random_file = random.choice(files)
-    console.print("random file chosen for study is: ", random_file, style="bold red")
+def get_random_csv_file_path(catalog, directory):
+    # Picked from the catalog's index of the directory rather than a fresh listing
+    random_file = catalog.random_deck(directory)
+    console.print("random file chosen for study is: ", random_file.name, style="bold red")
     #print("random file chosen for study is: ", random_file)
-    return os.path.join(directory, random_file)
-
-def load_words_from_csv(file_path):
-    # # Load the CSV file
-    # df = pd.read_csv(file_path)
-    # # Get the second column (assuming the index starts at 0)
-    # words = df.iloc[:, 1].tolist()
-    # translations = df.iloc[:, 0].tolist()
-
-    # Define a lambda function to strip trailing whitespaces
-    strip_trailing_whitespace = lambda x: x.rstrip() if isinstance(x, str) else x
-
-    # Load the CSV file and apply the strip function to all elements in columns 0 and 1
-    df = pd.read_csv(file_path, converters={0: strip_trailing_whitespace, 1: strip_trailing_whitespace})
+    return random_file.path
 
-    # Get the words and translations from the DataFrame
-    words = df.iloc[:, 1].tolist()
-    translations = df.iloc[:, 0].tolist()
+def load_words_from_csv(file_path, strip_articles=False):
+    # Parsed once into the compiled deck cache; later launches skip pandas entirely.
+    # French words (column 2) are the prompts, English translations (column 1) the answers.
+    return load_deck(file_path, strip_articles=strip_articles)
 
-    return words, translations
+def load_words_from_csv_stats(file_path, store=None, strip_articles=False):
 
-def load_words_from_csv_stats(file_path):
+    _ , df = st.order_by_stats(file_path, store)
 
-    # Define a lambda function to strip trailing whitespaces
-    strip_trailing_whitespace = lambda x: x.rstrip() if isinstance(x, str) else x
+    # order_by_stats keeps the deck's card ids as the index
+    return Deck.from_dataframe(df, path=file_path, strip_articles=strip_articles)
 
-    # Load the CSV file and apply the strip function to all elements in columns 0 and 1
-    df = pd.read_csv(file_path, converters={0: strip_trailing_whitespace, 1: strip_trailing_whitespace})
-    _ , df = st.order_by_stats(file_path)
 
-    # Get the words and translations from the DataFrame
-    words = df.iloc[:, 1].tolist()
-    translations = df.iloc[:, 0].tolist()
+# Speech engine in use; set from --engine in main()
+tts_engine = 'gtts'
 
-    return words, translations
+def synthesize_word(word, lang='fr'):
+    # Return the clip bytes for a word, only calling the engine on a cache miss
+    audio = audio_cache.get(word, lang, engine=cache_engine(tts_engine))
+    if audio is None:
+        audio, produced_by = synthesize_named(word, lang, tts_engine)
+        audio_cache.put(word, lang, audio, ext=audio_ext(audio), engine=produced_by)
+    return audio
 
+def is_word_cached(word, lang='fr'):
+    return audio_cache.contains(word, lang, engine=cache_engine(tts_engine))
 
 # Function to play the French word using gTTS and pygame
 def speak_word(word):
-    tts = gTTS(text=word, lang='fr')
-    filename = "word.mp3"
-    tts.save(filename)
-    # Load and play the mp3 file
-    pygame.mixer.music.load(filename)
-    pygame.mixer.music.play()
-    # Wait for the audio to finish playing
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(10)
-    # Remove the temporary file
-    os.remove(filename)
+    player.play(synthesize_word(word))
 
-def display_options(file_dict):
+def display_options(catalog):
     table = Table(title="Flashcard File Options")
     
     table.add_column("Number", justify="right", style="cyan", no_wrap=True)
     table.add_column("File Name", style="magenta")
+    table.add_column("Cards", justify="right")
+    table.add_column("Accuracy", justify="right")
+    table.add_column("Last Studied")
     
-    for number, file_path in file_dict.items():
-        # Extract only the file name from the full file path
-        file_name = os.path.basename(file_path)
-        table.add_row(str(number), file_name)
+    # Option 1 picks a random deck; the catalog's decks follow from 2
+    table.add_row("1", "aRandomSet.csv", "", "", "")
+    for number, entry in enumerate(catalog.entries, 2):
+        acc = accuracy(entry)
+        last = datetime.fromtimestamp(entry.last_studied).strftime('%Y-%m-%d') if entry.last_studied else ""
+        table.add_row(str(number), entry.name, str(entry.rows), f"{acc:.0%}" if acc is not None else "", last)
     
     console = Console()
     console.print(table)
 
 
 def main():
+    global tts_engine
     args = parse_args()
-    display_options(file_options)
+    player.rate = args.rate
+    tts_engine = args.engine
+    catalog = DeckCatalog()
+    catalog.refresh()
+    display_options(catalog)
     # Load words and translations from the CSV file
     #words_file_path = 'data/translations_g_sorted_2023-10-14.csv'  # Update the path to your CSV file if needed
     #csv_directory = './data/25split/01-12-2023/randomorder'
@@ -146,112 +142,155 @@ def main():
     try:
         choice = int(input("Enter the number of the file you want to use: "))
         if choice == 1:
-            words_file_path = get_random_csv_file_path(csv_directory)
+            words_file_path = get_random_csv_file_path(catalog, csv_directory)
         else:
-            selected_file = file_options[choice]
-            words_file_path = os.path.join(os.getcwd(), selected_file)
+            words_file_path = catalog.get(choice - 1).path
     except FileNotFoundError:
         console.print("CSV file not found. Please make sure the path is correct.", style="bold red")
         return
+    except (IndexError, ValueError):
+        console.print("No such option.", style="bold red")
+        return
+    finally:
+        catalog.close()
     
+    # Every answer is logged as an event; older per-session CSVs are folded in once
+    store = StudyStore()
+    store.import_legacy_csvs()
+
     if args.stats:
-        french_words, english_translations = load_words_from_csv_stats(words_file_path)
+        cards = load_words_from_csv_stats(words_file_path, store, args.ignore_articles)
     else:
-        french_words, english_translations = load_words_from_csv(words_file_path)
+        cards = load_words_from_csv(words_file_path, args.ignore_articles)
+    french_words = cards.prompts
+    # Typo-tolerant grading indexes, built once here rather than on the first answer
+    prompt_index, answer_index = cards.prompt_index, cards.answer_index
+
+    # A pre-built pack for this deck (see audio_pack.py) skips decoding entirely
+    pack_path = pack_path_for(words_file_path, tts_engine)
+    audio_pack = AudioPack(pack_path) if os.path.exists(pack_path) else None
+    if audio_pack is not None:
+        audio_pack.ensure_mixer()
+        console.print(f"Using audio pack {pack_path} ({len(audio_pack)} clips)", style="dim")
+
+    if args.batch:
+        # The batch run already synthesizes every card in the background; prefetching too would
+        # only race it for the same words. Fetches still count as hits once the batch got there first.
+        args.prefetch = 0
+        threading.Thread(target=synthesize_batch, args=(french_words, audio_cache),
+                         kwargs={'engine': tts_engine}, daemon=True).start()
+
+    deck = os.path.abspath(words_file_path)
+    mode = 'cli-' + ('schedule' if args.schedule else 'sequential' if args.no_random
+                     else 'backward' if args.backward else 'stats' if args.stats else 'random')
 
     word_stats = {}  # Dictionary to hold the tally of attempts
-    if args.backward:
-        index = len(french_words) - 1
+    if args.schedule:
+        scheduler = Scheduler(cards.ids, store=store, deck=deck)
+        order = ScheduledOrder(scheduler)
+        console.print(f"{scheduler.due_count()} of {len(scheduler)} cards due", style="bold blue")
     else:
-        index = 0
+        scheduler = None
+        # Random mode favours the words missed most often, across all past sessions
+        history = store.word_stats(words=set(french_words))
+        weights = [error_weight(history.get(word)) for word in french_words]
+        order = make_order(args, len(french_words), weights)
+    prefetcher = Prefetcher(synthesize_word, is_word_cached, max_pending=max(1, args.prefetch))
     console.print("Welcome to the French Word Pronunciation Game!", style="bold green")
     try:
         while True:
-            #index = 0
-            if args.no_random:
-                console.print("args are: ", args.no_random, style="bold red")
-                if index >= len(french_words):  # Reset index if it reaches the end
-                    index = 0
-                word = french_words[index]
-                translation = english_translations[index]
-                console.print(f"Word {index+1} of {len(french_words)}", style="bold blue")
-                index += 1  # Increment index for the next round
-            elif args.backward:
-                console.print("args are: ", args.backward, style="bold red")
-                if index >= len(french_words):
-                    index = len(french_words) - 1
-                console.print(f"Word {index+1} of {len(french_words)}", style="bold blue")
-                word = french_words[index]
-                translation = english_translations[index]
-                index -= 1
-            elif args.stats:
-                console.print("args are: ", args.stats, style="bold red")
-                if index >= len(french_words):  # Reset index if it reaches the end
-                    index = 0
-                word = french_words[index]
-                translation = english_translations[index]
-                console.print(f"Word {index+1} of {len(french_words)}", style="bold blue")
-                index += 1  # Increment index for the next round
-            else:
-                random_index = random.randint(0, len(french_words) - 1)
-                console.print(f"Word {random_index+1} of {len(french_words)}", style="bold blue")
-                word = french_words[random_index]
-                translation = english_translations[random_index]
-
+            index = order.next()
+            console.print(f"Word {index+1} of {len(french_words)}", style="bold blue")
+            word = french_words[index]
+            translation = cards.answers[index]
+            # Synthesize the next few cards while this one is played and answered
+            if args.prefetch > 0:
+                prefetcher.schedule(french_words[i] for i in order.peek(args.prefetch)
+                                    if audio_pack is None or french_words[i] not in audio_pack)
 
             if word not in word_stats:
                 word_stats[word] = {'correct': 0, 'incorrect': 0, 'trans_correct': 0, 'trans_incorrect': 0}
             
-            speak_word(word)
-            user_input = Prompt.ask("Type the French word you heard")
-            user_input = replace_accents(user_input)
-            
-            if user_input.strip().lower() == word:
+            # Start playback without blocking so the learner can type while it plays
+            if audio_pack is not None and word in audio_pack:
+                player.play(audio_pack.sound(word, args.slow), block=False)
+            else:
+                player.play(prefetcher.fetch(word), block=False)
+            asked = time.perf_counter()
+            user_input = Prompt.ask("Type the French word you heard (? to replay)")
+            while user_input.strip() == '?':
+                player.replay(block=False)
+                user_input = Prompt.ask("Type the French word you heard (? to replay)")
+            player.skip()
+            response_ms = int((time.perf_counter() - asked) * 1000)
+            # Accent shortcuts like "e'" are expanded as part of normalizing the reply
+            verdict = prompt_index.grade(
+                normalize_answer(user_input, transliterate=True, strip_articles=args.ignore_articles), index)
+            correct = verdict.kind in (EXACT, TYPO)
+            score = int(correct)
+            if verdict.kind == EXACT:
                 console.print("Correct!", style="green")
-                word_stats[word]['correct'] += 1
+            elif verdict.kind == TYPO:
+                console.print(f"Correct, with a typo: it is spelled '{word}'.", style="yellow")
+            elif verdict.kind == CONFUSED:
+                console.print(f"Incorrect. '{french_words[verdict.other]}' is another word in this deck; "
+                              f"this one was '{word}'.", style="red")
             else:
                 console.print(f"Incorrect. The correct word was '{word}'.", style="red")
-                word_stats[word]['incorrect'] += 1
+            word_stats[word]['correct' if correct else 'incorrect'] += 1
+            store.record(deck, word, PRONUNCIATION, correct, cards.ids[index], mode, response_ms,
+                         outcome=verdict.kind,
+                         confused_with=cards.ids[verdict.other] if verdict.other is not None else None)
             
             # Ask for the translation
+            asked = time.perf_counter()
             user_translation = Prompt.ask("Type the English translation")
-            if user_translation.strip().lower() == translation.lower():
+            response_ms = int((time.perf_counter() - asked) * 1000)
+            verdict = answer_index.grade(normalize_answer(user_translation, strip_articles=args.ignore_articles), index)
+            correct = verdict.kind in (EXACT, TYPO)
+            score += correct
+            if verdict.kind == EXACT:
                 console.print("Correct translation!", style="green")
-                word_stats[word]['trans_correct'] += 1
+            elif verdict.kind == TYPO:
+                console.print(f"Correct translation, with a typo: it is spelled '{translation}'.", style="yellow")
+            elif verdict.kind == CONFUSED:
+                console.print(f"Incorrect translation. That is the translation of '{french_words[verdict.other]}'; "
+                              f"'{word}' means '{translation}'.", style="red")
             else:
                 console.print(f"Incorrect translation. The correct translation is '{translation}'.", style="red")
-                word_stats[word]['trans_incorrect'] += 1
+            word_stats[word]['trans_correct' if correct else 'trans_incorrect'] += 1
+            store.record(deck, word, TRANSLATION, correct, cards.ids[index], mode, response_ms,
+                         outcome=verdict.kind,
+                         confused_with=cards.ids[verdict.other] if verdict.other is not None else None)
+            if scheduler is not None:
+                card = scheduler.answer(index, grade(score, 2))
+                console.print(f"Next review in {card.interval:g} day(s)" if card.interval
+                              else "This card will come back soon.", style="dim")
+            if isinstance(order, WeightedOrder):
+                past = history.get(word, {})
+                combined = {key: count + past.get(key, 0) for key, count in word_stats[word].items()}
+                order.update(index, error_weight(combined))
             
             if Prompt.ask("Try another word? (y/n)").lower() == 'n':
                 break
-
-            if args.no_random and index >= len(french_words):
-                index = 0
     finally:
-        save_results(word_stats)
+        player.close()
+        prefetcher.cancel()
+        console.print(prefetcher.summary(), style="dim")
+        for name, metrics in backend_metrics().items():
+            console.print(f"tts {name}: {metrics}", style="dim")
+        store.close()
+        if store.journal is not None and store.journal.error is not None:
+            console.print(f"Some answers could not be saved ({store.journal.error}); they are kept in "
+                          f"{store.journal.path} and recovered on the next launch", style="bold red")
         show_results_table(word_stats)
-        #plot_data(word_stats)  # Add this line to plot the data
-        stats_dir = 'stats'  # Assuming you have the 'stats' directory path here
-        plots_dir = 'plots'  # Assuming you have the 'plots' directory path here
-        plot_data_with_plotly(word_stats, plots_dir)
+        # Rendered by a detached process from the answers just flushed to the store, so quitting is immediate
+        if word_stats:
+            report = render_in_background(store.session, args.report)
+            if report:
+                console.print(f"Session report: {report} (rendering in the background)", style="dim")
 
 
-def save_results(word_stats):
-    # Ensure stats directory exists
-    os.makedirs('stats', exist_ok=True)
-    # Convert the word_stats dictionary to a list of dictionaries suitable for a DataFrame
-    records = [{'Word': word,
-                'Correct': stats['correct'],
-                'Incorrect': stats['incorrect'],
-                'Trans Correct': stats['trans_correct'],
-                'Trans Incorrect': stats['trans_incorrect']}
-               for word, stats in word_stats.items()]
-    # Create a DataFrame from the records
-    df = pd.DataFrame(records)
-    # Save to CSV
-    date_str = datetime.now().strftime('%T_%d_%m_%Y').replace(':', '-')
-    df.to_csv(f'stats/date_{date_str}.csv', index=False)
-
 def show_results_table(word_stats):
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("Word", style="dim", width=12)
@@ -267,44 +306,5 @@ def show_results_table(word_stats):
                       str(stats['trans_incorrect']))
     console.print(table)
 
-def plot_data_with_plotly(word_stats, plots_dir):
-    words = list(word_stats.keys())
-    correct_counts = [word_stats[word]['correct'] for word in words]
-    incorrect_counts = [word_stats[word]['incorrect'] for word in words]
-    trans_correct_counts = [word_stats[word]['trans_correct'] for word in words]
-    trans_incorrect_counts = [word_stats[word]['trans_incorrect'] for word in words]
-    
-    # Create subplots
-    fig = make_subplots(rows=1, cols=2, subplot_titles=("Pronunciation", "Translation"))
-
-    # Pronunciation subplot
-    fig.add_trace(
-        go.Bar(x=words, y=correct_counts, name='Correct Pronunciation'),
-        row=1, col=1
-    )
-    fig.add_trace(
-        go.Bar(x=words, y=incorrect_counts, name='Incorrect Pronunciation'),
-        row=1, col=1
-    )
-
-    # Translation subplot
-    fig.add_trace(
-        go.Bar(x=words, y=trans_correct_counts, name='Correct Translation'),
-        row=1, col=2
-    )
-    fig.add_trace(
-        go.Bar(x=words, y=trans_incorrect_counts, name='Incorrect Translation'),
-        row=1, col=2
-    )
-
-    # Update layout
-    fig.update_layout(title_text="Performance Overview", barmode='group')
-    
-    # Save the figure
-    file_path = os.path.join(plots_dir, 'run_plot.png')
-    fig.write_image(file_path)
-    print(f"Plot saved to {file_path}")
-    fig.show()
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,279 @@
+import base64
+import io
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TONE_RATE = 22050
+
+# Endpoint gTTS talks to; point BAVARD_GTTS_URL at tts_stub_server.py to run without the network
+GTTS_URL = "https://translate.google.com/_/TranslateWebserverUi/data/batchexecute"
+
+_GTTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+def audio_ext(audio):
+    # Engines disagree on container format; the cache and the player only need to know which
+    return 'wav' if audio[:4] == b'RIFF' else 'mp3'
+
+
+class BackendMetrics:
+    """Call, retry and failure counts plus a rolling window of successful latencies."""
+
+    def __init__(self, window=1000):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds=None, failed=False, retried=False):
+        with self._lock:
+            if retried:
+                self.retries += 1
+                return
+            self.calls += 1
+            if failed:
+                self.failures += 1
+            else:
+                self.latencies.append(seconds)
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+        result = {'calls': self.calls, 'failures': self.failures, 'retries': self.retries}
+        if latencies:
+            result['mean_ms'] = statistics.fmean(latencies) * 1000
+            result['p50_ms'] = latencies[len(latencies) // 2] * 1000
+            result['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        return result
+
+
+class TTSBackend:
+    """A speech engine. Subclasses implement `_synthesize(text, lang)` and honour `self.timeout`.
+
+    `synthesize` adds retries with exponential backoff and records latency
+    metrics for every call.
+    """
+
+    name = None
+
+    def __init__(self, timeout=10.0, retries=1, backoff=0.2):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = BackendMetrics()
+
+    def _synthesize(self, text, lang):
+        raise NotImplementedError
+
+    def _synthesize_named(self, text, lang):
+        return self._synthesize(text, lang), self.name
+
+    def synthesize(self, text, lang='fr'):
+        return self.synthesize_named(text, lang)[0]
+
+    def synthesize_named(self, text, lang='fr'):
+        """Return (clip, name of the engine that produced it); for a fallback chain, the member that answered."""
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                audio = self._synthesize_named(text, lang)
+            except Exception:
+                if attempt == self.retries:
+                    self.metrics.record(failed=True)
+                    raise
+                self.metrics.record(retried=True)
+                time.sleep(self.backoff * (2 ** attempt))
+            else:
+                self.metrics.record(time.perf_counter() - started)
+                return audio
+
+    def synthesize_many(self, texts, lang='fr', concurrency=4):
+        """Synthesize `texts` with up to `concurrency` requests in flight; failures come back as exceptions."""
+        def run(text):
+            try:
+                return self.synthesize(text, lang)
+            except Exception as e:
+                return e
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(run, texts))
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS, speaking the same batchexecute protocol as gTTS."""
+
+    name = 'gtts'
+
+    def __init__(self, url=None, session=None, pooled=True, **kwargs):
+        # The pooled session already retries at the HTTP level
+        kwargs.setdefault('retries', 0 if pooled else 1)
+        super().__init__(**kwargs)
+        self.url = url or os.environ.get('BAVARD_GTTS_URL', GTTS_URL)
+        if pooled and session is None:
+            from tts_http import shared_session
+            session = shared_session(timeout=self.timeout)
+        self.session = session
+
+    def _post(self, body, headers):
+        if self.session is not None:
+            return self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        # Unpooled: a fresh connection per request, which is what gTTS itself does
+        import requests
+        return requests.post(self.url, data=body, headers=headers, timeout=self.timeout)
+
+    def _synthesize(self, text, lang):
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=lang)
+        audio = bytearray()
+        # gTTS splits long text into several requests; reuse its tokenizer and request bodies
+        for body in tts.get_bodies():
+            response = self._post(body, tts.GOOGLE_TTS_HEADERS)
+            response.raise_for_status()
+            match = _GTTS_AUDIO.search(response.text)
+            if match is None:
+                raise RuntimeError("no audio in TTS response")
+            audio += base64.b64decode(match.group(1))
+        return bytes(audio)
+
+
+class EspeakBackend(TTSBackend):
+    """Local speech synthesis through espeak-ng (or the older espeak) writing WAV to stdout."""
+
+    name = 'espeak'
+
+    def _synthesize(self, text, lang):
+        binary = shutil.which('espeak-ng') or shutil.which('espeak')
+        if binary is None:
+            raise RuntimeError("espeak-ng is not installed")
+        result = subprocess.run([binary, '-v', lang, '--stdout', text],
+                                capture_output=True, check=True, timeout=self.timeout)
+        return result.stdout
+
+
+class ToneBackend(TTSBackend):
+    """Deterministic offline stand-in: one short tone per letter, a gap between words
+    and a longer pause after sentence punctuation.
+
+    It needs no network or speech engine, so it is what tests and benchmarks run against.
+    """
+
+    name = 'tone'
+
+    def _synthesize(self, text, lang):
+        return tone_wav(text)
+
+
+class FallbackBackend(TTSBackend):
+    """Tries each backend in order and returns the first clip that comes back.
+
+    `synthesize_named` tells which member it came from, so callers can cache
+    a stand-in clip under that member's name instead of the preferred one's.
+    """
+
+    def __init__(self, backends):
+        super().__init__(retries=0)
+        self.backends = backends
+        self.name = ','.join(b.name for b in backends)
+
+    def _synthesize_named(self, text, lang):
+        errors = []
+        for backend in self.backends:
+            try:
+                return backend.synthesize_named(text, lang)
+            except Exception as e:
+                errors.append(f"{backend.name}: {e}")
+        raise RuntimeError("all TTS backends failed (" + "; ".join(errors) + ")")
+
+
+def tone_wav(text):
+    letter = int(TONE_RATE * 0.06)
+    gap = np.zeros(int(TONE_RATE * 0.25), dtype=np.int16)
+    pause = np.zeros(int(TONE_RATE * 0.7), dtype=np.int16)
+    t = np.arange(letter) / TONE_RATE
+    envelope = np.hanning(letter)
+    parts = []
+    words = text.split()
+    for i, word in enumerate(words):
+        letters = word.rstrip('.!?')
+        for ch in letters:
+            freq = 220 + (ord(ch) % 64) * 12
+            parts.append((np.sin(2 * np.pi * freq * t) * envelope * 12000).astype(np.int16))
+        if i < len(words) - 1:
+            parts.append(pause if letters != word else gap)
+    samples = np.concatenate(parts) if parts else np.zeros(letter, dtype=np.int16)
+    fp = io.BytesIO()
+    with wave.open(fp, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(TONE_RATE)
+        w.writeframes(samples.tobytes())
+    return fp.getvalue()
+
+
+ENGINES = {
+    'gtts': GTTSBackend,
+    'espeak': EspeakBackend,
+    'tone': ToneBackend,
+}
+
+_backends = {}
+
+
+def get_backend(spec='gtts', **kwargs):
+    """Build (once per process) the backend for `spec`, a comma-separated fallback order like 'gtts,espeak,tone'."""
+    key = (spec, tuple(sorted(kwargs.items())))
+    backend = _backends.get(key)
+    if backend is None:
+        names = [name.strip() for name in spec.split(',') if name.strip()]
+        unknown = [name for name in names if name not in ENGINES]
+        if not names or unknown:
+            raise ValueError(f"unknown TTS engine(s) {unknown or spec!r}; choose from {sorted(ENGINES)}")
+        chain = [ENGINES[name](**kwargs) for name in names]
+        backend = chain[0] if len(chain) == 1 else FallbackBackend(chain)
+        _backends[key] = backend
+    return backend
+
+
+def backend_metrics():
+    """Latency metrics of every backend built in this process, including fallback members."""
+    report = {}
+    for backend in _backends.values():
+        members = backend.backends if isinstance(backend, FallbackBackend) else []
+        for b in [backend] + members:
+            report[b.name] = b.metrics.summary()
+    return report
+
+
+def engine_spec(value):
+    # argparse type for --engine
+    get_backend(value)
+    return value
+
+
+def cache_engine(spec):
+    """Engine name clips for `spec` are looked up under in the audio cache: its first choice.
+
+    Clips are stored under the engine that actually produced them (see
+    `synthesize_named`), so one rendered by a fallback is never served as the
+    first choice's and is replaced once that engine answers again.
+    """
+    backend = get_backend(spec)
+    return backend.backends[0].name if isinstance(backend, FallbackBackend) else backend.name
+
+
+def synthesize(text, lang='fr', engine='gtts'):
+    return get_backend(engine).synthesize(text, lang)
+
+
+def synthesize_named(text, lang='fr', engine='gtts'):
+    return get_backend(engine).synthesize_named(text, lang)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` requests per second on average, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class PooledSession:
+    """A keep-alive connection pool shared by every remote TTS request in the process.
+
+    Up to `max_connections` requests can be in flight at once and reuse their
+    TCP/TLS connections. Each request gets its own timeout and is retried on
+    connection errors and 429/5xx answers with exponential backoff. With a
+    `rate_limit` (requests per second) requests wait for a token first.
+    """
+
+    def __init__(self, max_connections=8, timeout=10.0, retries=2, backoff=0.2, rate_limit=None):
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=None, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return self.session.post(url, data=data, headers=headers, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_session(**kwargs):
+    """Return the process-wide pool, creating it with `kwargs` on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PooledSession(**kwargs)
+        return _shared
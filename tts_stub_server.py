@@ -0,0 +1,149 @@
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rich.console import Console
+from rich.table import Table
+
+from tts_engines import GTTSBackend, tone_wav
+from tts_http import PooledSession
+
+console = Console()
+
+BATCHEXECUTE_PATH = "/_/TranslateWebserverUi/data/batchexecute"
+
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    """Answers gTTS batchexecute requests with tone audio in the same response envelope."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8")
+        if not self.path.startswith(BATCHEXECUTE_PATH):
+            self._reply(404, b"not found")
+            return
+        try:
+            rpc = json.loads(urllib.parse.parse_qs(body)["f.req"][0])
+            text, lang = json.loads(rpc[0][0][1])[:2]
+        except (KeyError, IndexError, ValueError):
+            self._reply(400, b"bad request")
+            return
+        with server.lock:
+            server.requests += 1
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if random.random() < server.fail_rate:
+            self._reply(503, b"unavailable")
+            return
+        audio = base64.b64encode(tone_wav(text)).decode("ascii")
+        envelope = [["wrb.fr", "jQ1olc", json.dumps([audio]), None, None, None, "generic"]]
+        self._reply(200, (")]}'\n\n" + json.dumps(envelope, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    def _reply(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, fail_rate=0.0):
+    """Start the stand-in on a daemon thread and return (server, base_url). Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StubTTSHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.fail_rate = fail_rate
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="tts-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{BATCHEXECUTE_PATH}"
+
+
+def load_test(backend, count, concurrency):
+    words = [f"mot{i}" for i in range(count)]
+    started = time.perf_counter()
+    results = backend.synthesize_many(words, 'fr', concurrency)
+    failures = sum(isinstance(r, Exception) for r in results)
+    return time.perf_counter() - started, failures
+
+
+def compare(url, count, concurrency, rate_limit=None):
+    """Per-clip latency of gTTS-style fresh connections vs the shared keep-alive pool."""
+    runs = [
+        ("sequential, new connection per clip", GTTSBackend(url=url, pooled=False), 1),
+        ("sequential, pooled", GTTSBackend(url=url, session=PooledSession(1, rate_limit=rate_limit)), 1),
+        (f"pooled, {concurrency} in flight",
+         GTTSBackend(url=url, session=PooledSession(concurrency, rate_limit=rate_limit)), concurrency),
+    ]
+    table = Table(title=f"Remote TTS latency against the stand-in ({count} clips per run)")
+    table.add_column("Mode", style="cyan")
+    table.add_column("Wall", justify="right")
+    table.add_column("Clips/s", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Failures", justify="right")
+    for label, backend, in_flight in runs:
+        elapsed, failures = load_test(backend, count, in_flight)
+        metrics = backend.metrics.summary()
+        table.add_row(label, f"{elapsed:.2f}s", f"{count / elapsed:.1f}",
+                      f"{metrics.get('p50_ms', 0):.1f}", f"{metrics.get('p95_ms', 0):.1f}", str(failures))
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the gTTS endpoint")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency in seconds')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+    parser.add_argument('--load', type=int, default=0, help='Instead of serving, fire this many requests at the stand-in')
+    parser.add_argument('--concurrency', type=int, default=1, help='Concurrent requests during --load')
+    parser.add_argument('--compare', action='store_true', help='With --load, compare sequential and pooled requests')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second allowed by the pooled session')
+    args = parser.parse_args()
+
+    server, url = start_server(args.host, 0 if args.load else args.port, args.latency, args.jitter, args.fail_rate)
+    if args.load and args.compare:
+        compare(url, args.load, max(2, args.concurrency), args.rate_limit)
+        server.shutdown()
+        return
+    if not args.load:
+        console.print(f"Stub TTS listening on {url}\nRun the game with BAVARD_GTTS_URL={url}", style="bold green")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    session = PooledSession(max(1, args.concurrency), timeout=5.0, retries=2, backoff=0.05, rate_limit=args.rate_limit)
+    backend = GTTSBackend(url=url, session=session)
+    elapsed, failures = load_test(backend, args.load, args.concurrency)
+    server.shutdown()
+    metrics = backend.metrics.summary()
+    table = Table(title=f"gTTS stand-in load test ({args.load} requests, concurrency {args.concurrency})")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("Wall time", f"{elapsed:.2f}s")
+    table.add_row("Throughput", f"{args.load / elapsed:.1f} req/s")
+    table.add_row("Failures", str(failures))
+    for key, value in metrics.items():
+        table.add_row(key, f"{value:.1f}" if isinstance(value, float) else str(value))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
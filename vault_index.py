@@ -0,0 +1,285 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+
+from deck_paths import vault_decks, vault_directory
+
+MANIFEST = '.vault_index.json'
+SKIP_DIRS = {'.obsidian', '.trash', '.git'}
+
+# Header names that say which column holds the French word and which the translation
+FRENCH_HEADERS = {'french', 'français', 'francais', 'mot', 'mots', 'word', 'expression', 'fr'}
+ENGLISH_HEADERS = {'english', 'anglais', 'translation', 'traduction', 'meaning', 'en'}
+
+_SEPARATOR_ROW = re.compile(r'^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$')
+_WIKILINK = re.compile(r'\[\[(?:[^\]|]*\|)?([^\]]*)\]\]')
+_MDLINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_EMPHASIS = re.compile(r'(\*\*|__|\*|_|`|==|~~)')
+
+
+def _cells(line):
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [cell.strip() for cell in re.split(r'(?<!\\)\|', line)]
+
+
+def clean_cell(text):
+    text = _WIKILINK.sub(r'\1', text)
+    text = _MDLINK.sub(r'\1', text)
+    text = _EMPHASIS.sub('', text)
+    return text.replace('\\|', '|').strip()
+
+
+def extract_pairs(markdown):
+    """(english, french) pairs from every two-or-more column table in a note.
+
+    Columns are picked by header name when one matches, otherwise the first
+    column is taken as French and the second as English.
+    """
+    pairs = []
+    lines = markdown.splitlines()
+    i = 0
+    while i < len(lines) - 1:
+        if '|' in lines[i] and _SEPARATOR_ROW.match(lines[i + 1].strip()):
+            header = [clean_cell(c).lower() for c in _cells(lines[i])]
+            if len(header) >= 2:
+                fr = next((k for k, h in enumerate(header) if h in FRENCH_HEADERS), 0)
+                en = next((k for k, h in enumerate(header) if h in ENGLISH_HEADERS and k != fr), 1 if fr == 0 else 0)
+                i += 2
+                while i < len(lines) and lines[i].strip().startswith('|'):
+                    cells = _cells(lines[i])
+                    if max(fr, en) < len(cells):
+                        french, english = clean_cell(cells[fr]), clean_cell(cells[en])
+                        if french and english:
+                            pairs.append((english, french))
+                    i += 1
+                continue
+        i += 1
+    return pairs
+
+
+def _deck_path(note, output):
+    return os.path.join(output, os.path.splitext(note)[0] + '.csv')
+
+
+def _write_deck(path, pairs):
+    fp = io.StringIO()
+    writer = csv.writer(fp, lineterminator='\n')
+    writer.writerow(['English', 'French'])
+    writer.writerows(pairs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(fp.getvalue())
+    os.replace(tmp_path, path)
+
+
+class VaultIndex:
+    """Keeps one deck CSV per vault note that contains vocabulary tables.
+
+    Decks go under `output`, mirroring the vault layout, so the deck catalog,
+    the CLI and the picker see them like any other deck. A manifest records
+    each note's size, mtime and content hash: unchanged notes cost one stat,
+    touched-but-identical notes one hash, and only edited notes are parsed
+    and their deck rewritten.
+    """
+
+    def __init__(self, vault=vault_directory, output=vault_decks):
+        self.vault = os.path.expanduser(vault)
+        self.output = output
+        self.manifest_path = os.path.join(output, MANIFEST)
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}  # note -> [size, mtime_ns, sha256, pairs]
+
+    def _notes(self):
+        stack = [self.vault]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.endswith('.md'):
+                            st = entry.stat()
+                            yield os.path.relpath(entry.path, self.vault), st.st_size, st.st_mtime_ns
+            except OSError:
+                continue
+
+    def _index_note(self, note, size, mtime_ns):
+        """Re-index one note if it changed. Returns True when its deck was rewritten or removed."""
+        known = self.manifest.get(note)
+        if known is not None and known[:2] == [size, mtime_ns]:
+            return False
+        try:
+            with open(os.path.join(self.vault, note), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return self._forget(note)
+        sha256 = hashlib.sha256(data).hexdigest()
+        if known is not None and known[2] == sha256:
+            known[:2] = [size, mtime_ns]  # Touched, not edited
+            return False
+        pairs = extract_pairs(data.decode('utf-8', errors='replace'))
+        deck = _deck_path(note, self.output)
+        if pairs:
+            _write_deck(deck, pairs)
+        elif os.path.exists(deck):
+            os.remove(deck)
+        self.manifest[note] = [size, mtime_ns, sha256, len(pairs)]
+        return True
+
+    def _forget(self, note):
+        entry = self.manifest.pop(note, None)
+        deck = _deck_path(note, self.output)
+        if os.path.exists(deck):
+            os.remove(deck)
+        return entry is not None
+
+    def save(self):
+        os.makedirs(self.output, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def refresh(self):
+        """Walk the vault once and re-index what changed. Returns (notes seen, notes re-indexed)."""
+        seen = set()
+        changed = 0
+        for note, size, mtime_ns in self._notes():
+            seen.add(note)
+            changed += self._index_note(note, size, mtime_ns)
+        for note in [n for n in self.manifest if n not in seen]:
+            changed += self._forget(note)
+        self.save()
+        return len(seen), changed
+
+    def update_paths(self, paths):
+        """Re-index just these notes (absolute paths, e.g. from a file watcher)."""
+        changed = 0
+        for path in paths:
+            note = os.path.relpath(path, self.vault)
+            if not note.endswith('.md') or note.startswith('..'):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                changed += self._forget(note)
+                continue
+            changed += self._index_note(note, st.st_size, st.st_mtime_ns)
+        if changed:
+            self.save()
+        return changed
+
+    def watch(self, interval=2.0, on_change=None):
+        """Keep the decks in sync until interrupted.
+
+        Uses watchdog's file events when it is installed, so only touched notes
+        are looked at; otherwise polls with `refresh` every `interval` seconds.
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            while True:
+                _, changed = self.refresh()
+                if changed and on_change:
+                    on_change(changed)
+                time.sleep(interval)
+
+        dirty = set()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    dirty.add(event.src_path)
+                    if getattr(event, 'dest_path', None):
+                        dirty.add(event.dest_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), self.vault, recursive=True)
+        observer.start()
+        try:
+            while True:
+                time.sleep(interval)
+                if dirty:
+                    paths = list(dirty)
+                    dirty.difference_update(paths)
+                    changed = self.update_paths(paths)
+                    if changed and on_change:
+                        on_change(changed)
+        finally:
+            observer.stop()
+            observer.join()
+
+
+def _bench(notes):
+    table = "| Français | English |\n| --- | --- |\n" + "".join(
+        f"| le mot {i} | the word {i} |\n" for i in range(20))
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = os.path.join(tmp, 'vault')
+        for i in range(notes):
+            folder = os.path.join(vault, f"folder{i % 50}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"note{i}.md"), 'w', encoding='utf-8') as f:
+                f.write(f"# Note {i}\n\nSome prose.\n\n{table}" if i % 2 else f"# Note {i}\n\nNo vocabulary.\n")
+        output = os.path.join(tmp, 'decks')
+        started = time.perf_counter()
+        seen, changed = VaultIndex(vault, output).refresh()
+        cold = time.perf_counter() - started
+        edited = os.path.join(vault, 'folder1', 'note1.md')
+        with open(edited, 'a', encoding='utf-8') as f:
+            f.write("| le chat | the cat |\n")
+        started = time.perf_counter()
+        _, rescan_changed = VaultIndex(vault, output).refresh()
+        rescan = time.perf_counter() - started
+        with open(edited, 'a', encoding='utf-8') as f:
+            f.write("| le chien | the dog |\n")
+        index = VaultIndex(vault, output)
+        started = time.perf_counter()
+        index.update_paths([edited])
+        targeted = time.perf_counter() - started
+    print(f"{seen} notes: cold index {cold * 1000:.0f}ms, "
+          f"re-index after one edit {rescan * 1000:.1f}ms ({rescan_changed} note re-parsed), "
+          f"watched update {targeted * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index vocabulary tables from the Obsidian vault into decks")
+    parser.add_argument('--vault', default=vault_directory)
+    parser.add_argument('--output', default=vault_decks, help='Where the generated deck CSVs go')
+    parser.add_argument('--watch', action='store_true', help='Keep running and re-index notes as they change')
+    parser.add_argument('--interval', type=float, default=2.0)
+    parser.add_argument('--bench', type=int, metavar='NOTES', help='Benchmark on a generated vault of NOTES notes')
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.bench)
+        return
+    index = VaultIndex(args.vault, args.output)
+    started = time.perf_counter()
+    seen, changed = index.refresh()
+    print(f"{seen} notes, {changed} re-indexed in {(time.perf_counter() - started) * 1000:.0f}ms")
+    if args.watch:
+        print("Watching for changes (Ctrl+C to stop)")
+        try:
+            index.watch(args.interval, lambda changed: print(f"{changed} note(s) re-indexed"))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()